@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Customer Data Changefeed
+Emits versioned change sets (added, updated and removed customers) between
+pipeline builds, plus a manifest with the build id and content hash, so
+consumers can apply small deltas instead of reparsing the full dataset.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+
+CHANGES_DIR = 'changes'
+MANIFEST_FILE = 'manifest.json'
+# Per-customer hashes of the current build, in a file named per build so the
+# manifest switches to it atomically: state-<build id>.json
+STATE_PREFIX = 'state'
+
+# Number of change sets kept on disk; older consumers fall back to a full reload
+MAX_CHANGESETS = 50
+
+def customer_hash(customer):
+    """Stable content hash of a single customer record"""
+    encoded = json.dumps(customer, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def diff_customers(previous_hashes, customers):
+    """Compare customers against the previous build's per-customer hashes.
+
+    Returns (changeset, current_hashes) where changeset holds the added and
+    updated customer records and the removed customer ids.
+    """
+    current_hashes = {}
+    added = []
+    updated = []
+    for customer in customers:
+        key = str(customer['id'])
+        digest = customer_hash(customer)
+        current_hashes[key] = digest
+        if key not in previous_hashes:
+            added.append(customer)
+        elif previous_hashes[key] != digest:
+            updated.append(customer)
+
+    removed = sorted(int(key) for key in previous_hashes if key not in current_hashes)
+    return {'added': added, 'updated': updated, 'removed': removed}, current_hashes
+
+def apply_changeset(customers, changeset):
+    """Apply a change set to a list of customers in place and return it.
+
+    Added and updated records are upserted by id, so applying a change set
+    twice, or one that re-adds customers already present, never duplicates.
+    """
+    removed = set(changeset['removed'])
+    upserts = {c['id']: c for c in changeset['added']}
+    upserts.update((c['id'], c) for c in changeset['updated'])
+    present = set()
+    kept = []
+    for customer in customers:
+        if customer['id'] in removed:
+            continue
+        present.add(customer['id'])
+        kept.append(upserts.get(customer['id'], customer))
+    kept.extend(c for c_id, c in upserts.items() if c_id not in present and c_id not in removed)
+    customers[:] = kept
+    return customers
+
+def state_file_name(build_id):
+    """Name of the per-customer hash file recorded for a build"""
+    return f"{STATE_PREFIX}-{build_id}.json"
+
+def _load_json(path, default):
+    """Load a JSON file, returning default if it does not exist"""
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    """Write JSON atomically so consumers never read a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'), default=str)
+    os.replace(tmp_path, path)
+
+def write_changefeed(customers, data_file):
+    """Write the change set since the last build and update the manifest.
+
+    The manifest records the current build id, the content hash of the full
+    data file and the ordered list of change sets, each naming the build it
+    applies on top of, plus the state file holding this build's per-customer
+    hashes. New files are written first and the manifest replaced last, so a
+    crash at any point leaves the previous manifest, state and change sets
+    consistent.
+    """
+    changes_dir = os.path.join(os.path.dirname(data_file), CHANGES_DIR)
+    os.makedirs(changes_dir, exist_ok=True)
+    manifest_path = os.path.join(changes_dir, MANIFEST_FILE)
+
+    manifest = _load_json(manifest_path, {'build_id': None, 'changesets': []})
+    # Without the previous build's hashes removals can't be detected, so no
+    # change set is written and consumers fall back to a full reload
+    previous_hashes = None
+    if manifest.get('state_file'):
+        previous_hashes = _load_json(os.path.join(changes_dir, manifest['state_file']), None)
+
+    changeset, current_hashes = diff_customers(previous_hashes or {}, customers)
+    data_hash = file_hash(data_file)
+    previous_build_id = manifest['build_id']
+
+    if previous_build_id and manifest.get('sha256') == data_hash:
+        print("  ℹ️  Data unchanged since last build, no change set written")
+        return manifest
+
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    build_id = f"{timestamp}-{data_hash[:8]}"
+
+    changesets = manifest['changesets']
+    if previous_build_id and previous_hashes is not None:
+        changeset_file = f"{build_id}.json"
+        _write_json(os.path.join(changes_dir, changeset_file), dict(
+            changeset, build_id=build_id, base_build_id=previous_build_id))
+        changesets.append({
+            'build_id': build_id,
+            'base_build_id': previous_build_id,
+            'file': changeset_file,
+            'added': len(changeset['added']),
+            'updated': len(changeset['updated']),
+            'removed': len(changeset['removed']),
+        })
+
+    # Change sets beyond the retention window are deleted once the new manifest is in place
+    expired = changesets[:max(0, len(changesets) - MAX_CHANGESETS)]
+    changesets = changesets[len(expired):]
+
+    manifest = {
+        'build_id': build_id,
+        'previous_build_id': previous_build_id,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'data_file': os.path.basename(data_file),
+        'sha256': data_hash,
+        'customer_count': len(customers),
+        'state_file': state_file_name(build_id),
+        'changesets': changesets,
+    }
+    _write_json(os.path.join(changes_dir, manifest['state_file']), current_hashes)
+    _write_json(manifest_path, manifest)
+
+    # Only now is it safe to drop files the previous manifest referenced
+    for entry in expired:
+        expired_path = os.path.join(changes_dir, entry['file'])
+        if os.path.exists(expired_path):
+            os.remove(expired_path)
+    for name in os.listdir(changes_dir):
+        if name.startswith(STATE_PREFIX) and name.endswith('.json') and name != manifest['state_file']:
+            os.remove(os.path.join(changes_dir, name))
+
+    if previous_build_id and previous_hashes is not None:
+        print(f"  🔄 Change set {build_id}: +{len(changeset['added'])} "
+              f"~{len(changeset['updated'])} -{len(changeset['removed'])}")
+    elif previous_build_id:
+        print(f"  🔄 Build {build_id} recorded without a change set (no state for {previous_build_id})")
+    else:
+        print(f"  🔄 Initial build {build_id} recorded (no previous build to diff against)")
+    return manifest
+
+def changesets_since(data_file, build_id):
+    """Return the ordered change sets a consumer at build_id needs, or None if it must fully reload"""
+    changes_dir = os.path.join(os.path.dirname(data_file), CHANGES_DIR)
+    manifest = _load_json(os.path.join(changes_dir, MANIFEST_FILE), None)
+    if manifest is None:
+        return None
+    if build_id == manifest['build_id']:
+        return []
+
+    pending = []
+    current = build_id
+    for entry in manifest['changesets']:
+        if entry['base_build_id'] == current:
+            pending.append(_load_json(os.path.join(changes_dir, entry['file']), None))
+            current = entry['build_id']
+    if current != manifest['build_id'] or any(c is None for c in pending):
+        return None
+    return pending
+
+def main():
+    """Record a changefeed entry for the current enhanced dataset."""
+    data_file = 'customer_mapping_data_enhanced.json'
+
+    print("🚀 Writing Customer Data Changefeed")
+    print("=" * 40)
+    with open(data_file, 'r') as f:
+        customers = json.load(f)
+    manifest = write_changefeed(customers, data_file)
+    print(f"  ✅ Manifest build id: {manifest['build_id']}")
+
+if __name__ == "__main__":
+    main()
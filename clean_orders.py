@@ -4,13 +4,13 @@ Order Data Cleaning Script
 Cleans and standardizes order data from CSV export.
 """
 
-import pandas as pd
-import numpy as np
 from datetime import datetime
 import re
 
 def load_and_analyze_data(file_path):
     """Load CSV and analyze data quality issues."""
+    import pandas as pd
+    
     print("📊 Loading order data...")
     
     # Load CSV with proper handling of BOM and encoding
@@ -34,6 +34,8 @@ def load_and_analyze_data(file_path):
 
 def identify_issues(df):
     """Identify data quality issues."""
+    import pandas as pd
+    
     print("\n🔍 Identifying Data Issues:")
     issues = []
     
@@ -97,6 +99,8 @@ def identify_issues(df):
 
 def clean_data(df):
     """Clean and standardize the order data."""
+    import pandas as pd
+    
     print("\n🧹 Cleaning Data:")
     cleaned_df = df.copy()
     
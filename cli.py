@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Customer Mapping CLI
+Single entry point for the data pipeline scripts. Only the module behind
+the chosen subcommand is imported, so light commands never load pandas,
+numpy or requests; --timing reports what the import cost.
+
+    cli.py [--timing] <command> [args...]
+    cli.py imports            # profile every command's import cost
+"""
+
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
+# Subcommand -> (module with a main(), description)
+COMMANDS = {
+    'extract': ('extract_data', 'Build customer_mapping_data.json from the SQL dumps'),
+    'ingest': ('db_ingest', 'Build customer mapping data straight from the database'),
+    'dedupe': ('dedupe_organisations', 'Report duplicate organisations'),
+    'geocode-check': ('geocode_validation', 'Validate geocodes and queue re-geocoding'),
+    'cache': ('extract_cache', 'Show, clear or benchmark the extraction cache'),
+    'clean-orders': ('clean_orders', 'Clean the raw orders CSV export'),
+    'filter-orders': ('filter_orders', 'Filter orders down to those without jobs'),
+    'integrate': ('integrate_orders', 'Merge orders into customers and write every output'),
+    'analyze': ('analyze_data', 'Summarise customer_mapping_data.json'),
+    'search': ('search_index', 'Build, query or benchmark the search index'),
+    'changefeed': ('changefeed', 'Record a changefeed entry for the enhanced data'),
+    'precompress': ('precompress', 'Write gzip/brotli artefact variants and their manifest'),
+    'shards': ('shard_data', 'Write per-state and per-region shards'),
+    'markers': ('map_projection', 'Write compact map marker files'),
+    'heatmap': ('heatmap_grid', 'Write revenue heatmap tiles'),
+    'routes': ('route_planner', 'Plan a service route for overdue schools'),
+    'territories': ('territory_clustering', 'Report revenue-balanced sales territories'),
+    'load-test': ('load_test', 'Load test the API against scaled datasets'),
+}
+
+# Dependencies worth calling out when a command pulls them in
+HEAVY_MODULES = ('pandas', 'numpy', 'requests')
+
+# Startup budget per subcommand, in milliseconds, for both the module import
+# and a whole interpreter starting up and importing it
+IMPORT_BUDGET_MS = 200.0
+
+def heavy_modules_loaded():
+    """Heavy dependencies currently imported"""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+def import_command(command):
+    """Import the module behind a subcommand, returning (module, milliseconds)"""
+    import importlib
+
+    module_name = COMMANDS[command][0]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    return module, (time.perf_counter() - start) * 1000
+
+def profile_imports():
+    """Import every subcommand's module in a fresh interpreter and report the cost"""
+    import subprocess
+
+    probe = ("import sys, time; start = time.perf_counter(); import {module}; "
+             "elapsed = (time.perf_counter() - start) * 1000; "
+             "print(round(elapsed, 1), ','.join(m for m in {heavy!r} if m in sys.modules))")
+    print(f"⏱️  Import cost per command (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    for command, (module_name, _) in COMMANDS.items():
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', probe.format(module=module_name, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True)
+        process_ms = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            print(f"  - {command:14s} import failed: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        import_ms, _, heavy = result.stdout.strip().partition(' ')
+        within = float(import_ms) < IMPORT_BUDGET_MS and process_ms < IMPORT_BUDGET_MS
+        marker = '✅' if within else '⚠️ '
+        print(f"  {marker} {command:14s} import {float(import_ms):7.1f} ms, process {process_ms:7.1f} ms"
+              + (f"  [{heavy}]" if heavy else ""))
+
+def usage():
+    """Print the available subcommands"""
+    print(__doc__.strip().splitlines()[0])
+    print("\nUsage: cli.py [--timing] <command> [args...]\n")
+    for command, (_, description) in COMMANDS.items():
+        print(f"  {command:14s} {description}")
+    print(f"  {'imports':14s} Profile every command's import cost")
+
+def main():
+    """Dispatch to a subcommand's main(), importing only what it needs."""
+    args = sys.argv[1:]
+    timing = '--timing' in args[:1]
+    if timing:
+        args = args[1:]
+
+    if not args or args[0] in ('-h', '--help'):
+        usage()
+        return
+    command = args[0]
+    if command == 'imports':
+        profile_imports()
+        return
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n")
+        usage()
+        sys.exit(2)
+
+    module, import_ms = import_command(command)
+    if timing:
+        heavy = heavy_modules_loaded()
+        print(f"⏱️  {command}: imported {module.__name__} in {import_ms:.1f} ms "
+              f"({(time.perf_counter() - _STARTED) * 1000:.1f} ms since CLI start"
+              + (f"; loaded {', '.join(heavy)}" if heavy else "") + ")",
+              file=sys.stderr)
+
+    # Subcommand main()s read their arguments from sys.argv
+    sys.argv = [f"{module.__name__}.py"] + args[1:]
+    start = time.perf_counter()
+    module.main()
+    if timing:
+        print(f"⏱️  {command}: ran in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Customer Metrics
+Precomputes interaction recency and revenue-size buckets once in the
+pipeline so the server and map draw every marker from the same values.
+"""
+
+from datetime import date, datetime
+
+EPOCH = date(1970, 1, 1)
+NO_INTERACTION = -1
+
+# Recency buckets (match the map legend): < 12 months, 12-24 months, older, none
+RECENCY_RECENT = 0
+RECENCY_MODERATE = 1
+RECENCY_OLD = 2
+RECENCY_NONE = 3
+DAYS_PER_MONTH = 30.44
+
+# Revenue size buckets: index into MARKER_SIZES; lower bounds are exclusive
+REVENUE_SIZE_THRESHOLDS = (1000, 5000, 10000)
+MARKER_SIZES = (6, 8, 10, 12)
+
+def day_number(value):
+    """Days since 1970-01-01 for an ISO date/datetime string, or None"""
+    if not value:
+        return None
+    try:
+        return (date.fromisoformat(str(value)[:10]) - EPOCH).days
+    except ValueError:
+        return None
+
+def last_interaction_day(customer):
+    """Most recent service or order date as a day number"""
+    days = [day_number(customer.get('lastServiceDate')), day_number(customer.get('lastOrderDate'))]
+    days = [d for d in days if d is not None]
+    return max(days) if days else NO_INTERACTION
+
+def recency_bucket(interaction_day, today=None):
+    """Bucket a last-interaction day number relative to today"""
+    if interaction_day == NO_INTERACTION:
+        return RECENCY_NONE
+    today = today or date.today()
+    months = ((today - EPOCH).days - interaction_day) / DAYS_PER_MONTH
+    if months < 12:
+        return RECENCY_RECENT
+    if months < 24:
+        return RECENCY_MODERATE
+    return RECENCY_OLD
+
+def revenue_size_bucket(revenue):
+    """Bucket revenue into a marker size index"""
+    bucket = 0
+    for threshold in REVENUE_SIZE_THRESHOLDS:
+        if (revenue or 0) > threshold:
+            bucket += 1
+    return bucket
+
+def add_customer_metrics(customers, today=None):
+    """Add interaction and revenue bucket fields to each customer in place.
+
+    lastInteractionDate keeps the ISO format the server already exposes;
+    the day number and buckets are integers.
+    """
+    today = today or date.today()
+    for customer in customers:
+        interaction_day = last_interaction_day(customer)
+        job_revenue = customer.get('totalRevenue') or 0
+        order_revenue = customer.get('totalOrderRevenue') or 0
+        combined_revenue = job_revenue + order_revenue
+
+        if interaction_day == NO_INTERACTION:
+            customer['lastInteractionDate'] = None
+        else:
+            interaction_date = date.fromordinal(EPOCH.toordinal() + interaction_day)
+            customer['lastInteractionDate'] = datetime.combine(interaction_date, datetime.min.time()).isoformat() + 'Z'
+        customer['lastInteractionDay'] = interaction_day
+        customer['recencyBucket'] = recency_bucket(interaction_day, today)
+        customer['combinedRevenue'] = round(combined_revenue, 2)
+        customer['sizeBucket'] = revenue_size_bucket(combined_revenue)
+        customer['jobsSizeBucket'] = revenue_size_bucket(job_revenue)
+        customer['ordersSizeBucket'] = revenue_size_bucket(order_revenue)
+    return customers
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Organisation Deduplication
+Normalises organisation addresses and titles, finds duplicate organisations
+using a blocking index (postcode + token n-grams) and merges them into
+canonical entities so each address is geocoded once and revenue is not split.
+"""
+
+import re
+import json
+from collections import defaultdict
+
+# Street/title abbreviations expanded so "Rd" and "Road" compare equal
+ADDRESS_ABBREVIATIONS = {
+    'rd': 'road', 'st': 'street', 'ave': 'avenue', 'av': 'avenue',
+    'dr': 'drive', 'hwy': 'highway', 'pde': 'parade', 'cres': 'crescent',
+    'cr': 'crescent', 'ct': 'court', 'pl': 'place', 'tce': 'terrace',
+    'bvd': 'boulevard', 'blvd': 'boulevard', 'cnr': 'corner', 'ln': 'lane',
+    'esp': 'esplanade', 'cct': 'circuit', 'gr': 'grove', 'hts': 'heights',
+}
+
+TITLE_ABBREVIATIONS = {
+    'mt': 'mount', 'st': 'saint', 'sts': 'saints', 'coll': 'college',
+    'hs': 'high school', 'shs': 'state high school', 'ps': 'primary school',
+    'uni': 'university', '&': 'and',
+}
+
+# Words too common in titles to be useful on their own
+TITLE_STOPWORDS = {'the', 'of', 'and', 'school', 'college', 'campus'}
+
+# Street values used as placeholders rather than real addresses
+PLACEHOLDER_STREETS = {'tba', 'tbc', 'na', 'n a', 'unknown', 'none'}
+
+# Blocks larger than this are skipped to keep candidate generation near-linear
+MAX_BLOCK_SIZE = 50
+
+TITLE_MATCH_THRESHOLD = 0.85
+SHARED_ADDRESS_TITLE_THRESHOLD = 0.6
+
+def _tokens(text, abbreviations):
+    """Lowercase, strip punctuation and expand abbreviations into tokens"""
+    if not text:
+        return []
+    text = text.lower().replace('&', ' & ')
+    words = re.findall(r"[a-z0-9&]+", text)
+    tokens = []
+    for word in words:
+        tokens.extend(abbreviations.get(word, word).split())
+    return tokens
+
+def normalise_address(street, suburb='', postcode=''):
+    """Normalise an address to a canonical comparison key"""
+    street_tokens = _tokens(street, ADDRESS_ABBREVIATIONS)
+    if ' '.join(street_tokens) in PLACEHOLDER_STREETS:
+        return ''
+    parts = street_tokens + _tokens(suburb, ADDRESS_ABBREVIATIONS)
+    postcode = normalise_postcode(postcode)
+    if postcode:
+        parts.append(postcode)
+    return ' '.join(parts)
+
+def normalise_title(title):
+    """Normalise an organisation title to its significant tokens"""
+    return ' '.join(_tokens(title, TITLE_ABBREVIATIONS))
+
+def normalise_postcode(postcode):
+    """Return the 4-digit postcode or empty string"""
+    digits = ''.join(filter(str.isdigit, str(postcode or '')))
+    return digits.zfill(4) if 3 <= len(digits) <= 4 else ''
+
+def title_similarity(title_a, title_b):
+    """Jaccard similarity of significant title tokens"""
+    tokens_a = set(title_a.split()) - TITLE_STOPWORDS
+    tokens_b = set(title_b.split()) - TITLE_STOPWORDS
+    if not tokens_a or not tokens_b:
+        tokens_a, tokens_b = set(title_a.split()), set(title_b.split())
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+def _token_ngrams(tokens, n=2):
+    """Return token n-grams (falls back to unigrams for short inputs)"""
+    if len(tokens) < n:
+        return [tuple(tokens)] if tokens else []
+    return [tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+def build_blocking_index(organizations):
+    """Group organisation indexes into candidate blocks keyed by postcode and token n-grams"""
+    blocks = defaultdict(list)
+    for idx, org in enumerate(organizations):
+        postcode = normalise_postcode(org['physical_address_postcode'])
+        street_key = normalise_address(org['physical_address_street'])
+        title_tokens = [t for t in normalise_title(org['title']).split()
+                        if t not in TITLE_STOPWORDS]
+
+        if street_key:
+            blocks[('addr', postcode, street_key)].append(idx)
+        for gram in set(_token_ngrams(title_tokens)):
+            blocks[('title', postcode, gram)].append(idx)
+    return blocks
+
+class _UnionFind:
+    """Minimal union-find over integer indexes"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Lowest index becomes the root so canonical ids are stable
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+def is_duplicate(org_a, org_b):
+    """Decide whether two organisations in the same block are the same entity"""
+    title_a = normalise_title(org_a['title'])
+    title_b = normalise_title(org_b['title'])
+    similarity = title_similarity(title_a, title_b)
+
+    street_a = normalise_address(org_a['physical_address_street'])
+    street_b = normalise_address(org_b['physical_address_street'])
+    same_address = bool(street_a) and street_a == street_b
+
+    if same_address:
+        return similarity >= SHARED_ADDRESS_TITLE_THRESHOLD
+    if not street_a or not street_b:
+        return similarity >= TITLE_MATCH_THRESHOLD
+    # Different real streets are different sites, e.g. campuses of one college
+    return False
+
+def find_duplicate_groups(organizations):
+    """Return lists of organisation indexes that refer to the same entity"""
+    blocks = build_blocking_index(organizations)
+    union_find = _UnionFind(len(organizations))
+    seen_pairs = set()
+
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                a, b = members[i], members[j]
+                if (a, b) in seen_pairs or union_find.find(a) == union_find.find(b):
+                    continue
+                seen_pairs.add((a, b))
+                if is_duplicate(organizations[a], organizations[b]):
+                    union_find.union(a, b)
+
+    groups = defaultdict(list)
+    for idx in range(len(organizations)):
+        groups[union_find.find(idx)].append(idx)
+    return [members for members in groups.values() if len(members) > 1]
+
+def merge_organizations(organizations):
+    """Merge duplicate organisations into canonical entities.
+
+    Returns (canonical_organizations, alias_map) where alias_map maps every
+    merged-away organisation id to its canonical id.
+    """
+    groups = find_duplicate_groups(organizations)
+    merged_indexes = {}
+    for members in groups:
+        for idx in members:
+            merged_indexes[idx] = members
+
+    canonical = []
+    alias_map = {}
+    for idx, org in enumerate(organizations):
+        members = merged_indexes.get(idx)
+        if members is None:
+            canonical.append(dict(org, physical_address_street=org['physical_address_street'].strip()))
+            continue
+        if idx != members[0]:
+            continue
+
+        # Lowest id wins; blank fields are filled from the other duplicates
+        group = sorted((organizations[m] for m in members), key=lambda o: o['id'])
+        merged = dict(group[0])
+        for other in group[1:]:
+            alias_map[other['id']] = merged['id']
+            for field, value in other.items():
+                if not merged.get(field) and value:
+                    merged[field] = value
+        merged['physical_address_street'] = merged['physical_address_street'].strip()
+        merged['merged_ids'] = [o['id'] for o in group[1:]]
+        canonical.append(merged)
+
+    return canonical, alias_map
+
+def geocode_key(org):
+    """Key used to geocode each canonical address only once"""
+    return normalise_address(org['physical_address_street'],
+                             org['physical_address_suburb'],
+                             org['physical_address_postcode'])
+
+def main():
+    """Report duplicate organisations found in the SQL dump."""
+    from extract_data import extract_organizations
+
+    print("🚀 Finding Duplicate Organisations")
+    print("=" * 40)
+
+    organizations = extract_organizations()
+    print(f"  ✅ Loaded {len(organizations)} organisations")
+
+    canonical, alias_map = merge_organizations(organizations)
+    print(f"  🔗 Merged {len(alias_map)} duplicates into {len(organizations) - len(alias_map)} canonical organisations")
+
+    addresses = {geocode_key(org) for org in canonical if geocode_key(org)}
+    print(f"  📍 {len(addresses)} distinct addresses to geocode")
+
+    by_id = {org['id']: org for org in organizations}
+    for org in canonical:
+        if org.get('merged_ids'):
+            titles = [by_id[i]['title'] for i in org['merged_ids']]
+            print(f"    - {org['id']} {org['title']} <- {json.dumps(titles, ensure_ascii=False)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Extraction Cache
+Content-addressed on-disk memoisation for the SQL dump extractors. Results
+are pickled under a key built from the dump's SHA-256, the extractor name and
+its parser version, so an unchanged dump loads without re-parsing and any
+edit to the dump or bump of the parser version misses cleanly. Streaming
+extractors are cached record by record, so a hit streams too.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import tempfile
+import functools
+
+CACHE_DIR_ENV = 'EXTRACT_CACHE_DIR'
+CACHE_DISABLE_ENV = 'EXTRACT_CACHE_DISABLE'
+DEFAULT_CACHE_DIR = '.extract_cache'
+
+# Least recently used entries are evicted beyond this total size
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Entries kept per extractor; older keys belong to superseded dumps or parsers
+MAX_ENTRIES_PER_EXTRACTOR = 3
+
+HASH_CHUNK = 1024 * 1024
+HASH_INDEX_FILE = 'hashes.json'
+
+def cache_dir():
+    """Directory holding cache entries"""
+    return os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+def _load_hash_index(directory):
+    """Map of path -> [size, mtime_ns, sha256] from earlier runs"""
+    try:
+        with open(os.path.join(directory, HASH_INDEX_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _atomic_write(path, data):
+    """Write bytes to path via a temporary file so readers never see a partial entry"""
+    directory = os.path.dirname(path)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+def file_digest(path, directory=None):
+    """SHA-256 of a file, reusing the stored digest while size and mtime are unchanged"""
+    directory = directory or cache_dir()
+    stat = os.stat(path)
+    absolute = os.path.abspath(path)
+    index = _load_hash_index(directory)
+    known = index.get(absolute)
+    if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+        return known[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    index[absolute] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    os.makedirs(directory, exist_ok=True)
+    _atomic_write(os.path.join(directory, HASH_INDEX_FILE), json.dumps(index, indent=2).encode('utf-8'))
+    return index[absolute][2]
+
+def _entries(directory):
+    """(path, size, last used) for every cache entry"""
+    entries = []
+    if not os.path.isdir(directory):
+        return entries
+    for name in os.listdir(directory):
+        if name.endswith('.pickle'):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            entries.append((path, stat.st_size, stat.st_mtime))
+    return entries
+
+def evict(directory=None, max_bytes=MAX_CACHE_BYTES, max_per_extractor=MAX_ENTRIES_PER_EXTRACTOR):
+    """Drop the least recently used entries over the per-extractor and total limits.
+
+    Returns the number of entries removed.
+    """
+    directory = directory or cache_dir()
+    entries = sorted(_entries(directory), key=lambda entry: entry[2], reverse=True)
+    kept_per_extractor = {}
+    total = 0
+    removed = 0
+    for path, size, _ in entries:
+        extractor = os.path.basename(path).split('-', 1)[0]
+        kept_per_extractor[extractor] = kept_per_extractor.get(extractor, 0) + 1
+        if kept_per_extractor[extractor] > max_per_extractor or total + size > max_bytes:
+            os.remove(path)
+            removed += 1
+            continue
+        total += size
+    return removed
+
+def clear_cache(directory=None):
+    """Invalidate every cached extraction. Returns the number of entries removed."""
+    directory = directory or cache_dir()
+    entries = _entries(directory)
+    for path, _, _ in entries:
+        os.remove(path)
+    index_path = os.path.join(directory, HASH_INDEX_FILE)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    return len(entries)
+
+def _entry_path(extract, source_path, version):
+    """Cache entry for an extractor over the current content of source_path"""
+    directory = cache_dir()
+    key = hashlib.sha256(
+        f"{extract.__name__}:{version}:{file_digest(source_path, directory)}".encode('utf-8')
+    ).hexdigest()[:32]
+    return os.path.join(directory, f"{extract.__name__}-{key}.pickle")
+
+def disk_cached(source_path, version):
+    """Decorate a zero-argument extractor that parses source_path.
+
+    The result is pickled to <cache dir>/<name>-<key>.pickle, where the key
+    hashes the source file's content, the extractor name and version. Bump
+    version whenever the parser's output changes. Setting
+    EXTRACT_CACHE_DISABLE=1 bypasses the cache entirely.
+    """
+    def decorator(extract):
+        @functools.wraps(extract)
+        def wrapper():
+            if os.environ.get(CACHE_DISABLE_ENV) == '1' or not os.path.exists(source_path):
+                return extract()
+
+            directory = cache_dir()
+            entry = _entry_path(extract, source_path, version)
+
+            try:
+                with open(entry, 'rb') as f:
+                    result = pickle.load(f)
+                os.utime(entry)  # Mark as recently used for eviction
+                return result
+            except FileNotFoundError:
+                pass
+            except (pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+                os.remove(entry)  # Corrupt entry; rebuild it
+
+            result = extract()
+            os.makedirs(directory, exist_ok=True)
+            _atomic_write(entry, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+            evict(directory)
+            return result
+
+        wrapper.uncached = extract
+        return wrapper
+    return decorator
+
+def disk_cached_stream(source_path, version):
+    """Decorate a zero-argument extractor that yields records parsed from source_path.
+
+    Like disk_cached, but the entry is a sequence of individually pickled
+    records: a miss writes each record as it is yielded and a hit unpickles
+    them one at a time, so neither holds more than one record in memory. The
+    entry only replaces the temporary file once the parse has been consumed
+    to the end, so an abandoned stream never leaves a partial entry.
+    """
+    def decorator(extract):
+        @functools.wraps(extract)
+        def wrapper():
+            if os.environ.get(CACHE_DISABLE_ENV) == '1' or not os.path.exists(source_path):
+                yield from extract()
+                return
+
+            directory = cache_dir()
+            entry = _entry_path(extract, source_path, version)
+            try:
+                f = open(entry, 'rb')
+            except FileNotFoundError:
+                pass
+            else:
+                with f:
+                    os.utime(entry)  # Mark as recently used for eviction
+                    while True:
+                        try:
+                            record = pickle.load(f)
+                        except EOFError:
+                            return
+                        except (pickle.UnpicklingError, AttributeError, ValueError):
+                            os.remove(entry)  # Corrupt entry; the next run rebuilds it
+                            raise
+                        yield record
+
+            os.makedirs(directory, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(handle, 'wb') as f:
+                    for record in extract():
+                        pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+                        yield record
+                os.replace(temporary, entry)
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+            evict(directory)
+
+        wrapper.uncached = extract
+        return wrapper
+    return decorator
+
+def benchmark_cache():
+    """Time every extractor parsing from scratch versus loading from the cache"""
+    import extract_data
+
+    extractors = [extract_data.extract_organizations, extract_data.extract_regions,
+                  extract_data.extract_organization_types, extract_data.iter_cached_jobs]
+    def run(extract):
+        """Call an extractor, consuming it if it streams so the work happens"""
+        result = extract()
+        if not isinstance(result, (list, dict)):
+            for _ in result:
+                pass
+
+    print("⏱️  Benchmarking extraction cache")
+    for extractor in extractors:
+        start = time.perf_counter()
+        run(extractor.uncached)
+        parse_seconds = time.perf_counter() - start
+        run(extractor)  # Make sure an entry exists
+        start = time.perf_counter()
+        run(extractor)
+        cached_seconds = time.perf_counter() - start
+        print(f"  - {extractor.__name__:28s} parse {parse_seconds * 1000:7.1f} ms, "
+              f"cached {cached_seconds * 1000:6.1f} ms")
+
+def main():
+    """Show, clear or benchmark the extraction cache."""
+    command = sys.argv[1] if len(sys.argv) > 1 else '--stats'
+    if command == '--clear':
+        print(f"🗑️  Removed {clear_cache()} cached extractions from {cache_dir()}")
+    elif command == '--benchmark':
+        benchmark_cache()
+    else:
+        entries = _entries(cache_dir())
+        print(f"📦 {len(entries)} cached extractions in {cache_dir()}, "
+              f"{sum(size for _, size, _ in entries) / 1024:,.0f} KB")
+        for path, size, _ in sorted(entries):
+            print(f"  - {os.path.basename(path)} ({size / 1024:,.0f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import re
-import json
-import requests
 import time
 from datetime import datetime, timedelta
+from dedupe_organisations import merge_organizations, geocode_key
+from lazy_pipeline import sorted_by_key, merge_join, write_json_array
+from extract_cache import disk_cached, disk_cached_stream
+
+# Bump when a parser's output changes so cached extractions are not reused
+PARSER_VERSION = 1
 
 def parse_sql_value(value):
     """Parse a SQL value, removing quotes and handling NULL"""
@@ -15,62 +19,72 @@ def parse_sql_value(value):
         return value[1:-1].replace('""', '"')
     return value
 
-def extract_organizations():
-    """Extract organization data from SQL file"""
-    with open('data/wp_mops_organisations.sql', 'r') as f:
-        content = f.read()
+def split_sql_row(row_data):
+    """Split a SQL row's values by comma, respecting quoted strings"""
+    values = []
+    current_value = ''
+    in_quotes = False
+    quote_char = None
     
-    # Find all INSERT statements
-    insert_pattern = r'INSERT INTO `wp_mops_organisations`[^V]*VALUES\s*(.*?)(?=INSERT|$)'
-    insert_matches = re.findall(insert_pattern, content, re.DOTALL)
+    i = 0
+    while i < len(row_data):
+        char = row_data[i]
+        
+        if not in_quotes and char in ["'", '"']:
+            in_quotes = True
+            quote_char = char
+            current_value += char
+        elif in_quotes and char == quote_char:
+            # Check for escaped quote
+            if i + 1 < len(row_data) and row_data[i + 1] == quote_char:
+                current_value += char + char
+                i += 1
+            else:
+                in_quotes = False
+                quote_char = None
+                current_value += char
+        elif not in_quotes and char == ',':
+            values.append(current_value.strip())
+            current_value = ''
+        else:
+            current_value += char
+        
+        i += 1
     
-    organizations = []
+    # Add the last value
+    if current_value.strip():
+        values.append(current_value.strip())
     
-    for insert_values in insert_matches:
+    return values
+
+def iter_insert_blocks(path, table):
+    """Yield the VALUES section of each INSERT statement, one statement at a time"""
+    header = re.compile(r'INSERT INTO `' + re.escape(table) + r'`[^V]*VALUES\s*(.*)', re.DOTALL)
+    block = None
+    with open(path, 'r') as f:
+        for line in f:
+            if 'INSERT' in line:
+                if block is not None:
+                    yield ''.join(block)
+                match = header.search(line)
+                block = [match.group(1)] if match else None
+            elif block is not None:
+                block.append(line)
+    if block is not None:
+        yield ''.join(block)
+
+def iter_organizations(path='data/wp_mops_organisations.sql'):
+    """Yield organizations from the SQL file one at a time"""
+    for insert_values in iter_insert_blocks(path, 'wp_mops_organisations'):
         # Find individual value rows
         row_pattern = r'\(([^)]+)\)'
-        rows = re.findall(row_pattern, insert_values, re.DOTALL)
-        
-        for row_data in rows:
-            # Split by comma, respecting quoted strings
-            values = []
-            current_value = ''
-            in_quotes = False
-            quote_char = None
-            
-            i = 0
-            while i < len(row_data):
-                char = row_data[i]
-                
-                if not in_quotes and char in ["'", '"']:
-                    in_quotes = True
-                    quote_char = char
-                    current_value += char
-                elif in_quotes and char == quote_char:
-                    # Check for escaped quote
-                    if i + 1 < len(row_data) and row_data[i + 1] == quote_char:
-                        current_value += char + char
-                        i += 1
-                    else:
-                        in_quotes = False
-                        quote_char = None
-                        current_value += char
-                elif not in_quotes and char == ',':
-                    values.append(current_value.strip())
-                    current_value = ''
-                else:
-                    current_value += char
-                
-                i += 1
-            
-            # Add the last value
-            if current_value.strip():
-                values.append(current_value.strip())
+        for row_match in re.finditer(row_pattern, insert_values, re.DOTALL):
+            values = split_sql_row(row_match.group(1))
             
             # Extract organization data if we have enough values
             if len(values) >= 10:
                 try:
-                    org = {
+                    yield {
                         'id': int(values[0]),
                         'region_id': int(values[1]) if values[1] != 'NULL' else None,
                         'organisation_type_id': int(values[2]) if values[2] != 'NULL' else None,
@@ -82,12 +96,15 @@ def extract_organizations():
                         'email': parse_sql_value(values[8]) or '',
                         'phone': parse_sql_value(values[9]) or ''
                     }
-                    organizations.append(org)
                 except (ValueError, IndexError):
                     continue
-    
-    return organizations
 
+@disk_cached('data/wp_mops_organisations.sql', PARSER_VERSION)
+def extract_organizations():
+    """Extract organization data from SQL file"""
+    return list(iter_organizations())
+
+@disk_cached('data/wp_mops_regions.sql', PARSER_VERSION)
 def extract_regions():
     """Extract regions mapping"""
     with open('data/wp_mops_regions.sql', 'r') as f:
@@ -107,6 +124,7 @@ def extract_regions():
     
     return regions_map
 
+@disk_cached('data/wp_mops_organisation_types.sql', PARSER_VERSION)
 def extract_organization_types():
     """Extract organization types mapping"""
     with open('data/wp_mops_organisation_types.sql', 'r') as f:
@@ -122,17 +140,21 @@ def extract_organization_types():
         types_rows = re.findall(row_pattern, values_section)
         
         for type_id, type_name in types_rows:
-            if type_name in ['School - Catholic', 'School - Government', 'School - Private']:
-                org_types_map[int(type_id)] = 'school'
-            elif type_name == 'University':
-                org_types_map[int(type_id)] = 'university'
-            elif type_name in ['Industry', 'Supplier']:
-                org_types_map[int(type_id)] = 'industry'
-            else:
-                org_types_map[int(type_id)] = 'other'
+            org_types_map[int(type_id)] = classify_organization_type(type_name)
     
     return org_types_map
 
+def classify_organization_type(type_name):
+    """Map an organisation type title to the app's organization type"""
+    if type_name in ['School - Catholic', 'School - Government', 'School - Private']:
+        return 'school'
+    elif type_name == 'University':
+        return 'university'
+    elif type_name in ['Industry', 'Supplier']:
+        return 'industry'
+    else:
+        return 'other'
+
 def parse_datetime(datetime_str):
     """Parse datetime string and convert to AEST (+10 hours)"""
     if not datetime_str or datetime_str == 'NULL':
@@ -149,83 +171,46 @@ def parse_datetime(datetime_str):
     except (ValueError, TypeError):
         return None
 
-def extract_jobs():
-    """Extract jobs data from SQL file"""
-    with open('data/wp_mops_jobs.sql', 'r') as f:
-        lines = f.readlines()
-    
-    jobs = []
-    
-    # Parse line by line looking for job data rows
-    for line in lines:
-        line = line.strip()
-        
-        # Skip non-data lines
-        if not line.startswith('(') or not line.endswith('),') and not line.endswith(');'):
-            continue
+def iter_jobs(path='data/wp_mops_jobs.sql'):
+    """Yield jobs from the SQL file one at a time"""
+    with open(path, 'r') as f:
+        # Parse line by line looking for job data rows
+        for line in f:
+            line = line.strip()
             
-        # Remove parentheses and trailing comma/semicolon
-        if line.endswith('),'):
-            row_data = line[1:-2]
-        elif line.endswith(');'):
-            row_data = line[1:-2]
-        else:
-            continue
-            
-        # Split by comma, respecting quoted strings
-        values = []
-        current_value = ''
-        in_quotes = False
-        quote_char = None
-        
-        i = 0
-        while i < len(row_data):
-            char = row_data[i]
+            # Skip non-data lines
+            if not line.startswith('(') or not line.endswith('),') and not line.endswith(');'):
+                continue
             
-            if not in_quotes and char in ["'", '"']:
-                in_quotes = True
-                quote_char = char
-                current_value += char
-            elif in_quotes and char == quote_char:
-                # Check for escaped quote
-                if i + 1 < len(row_data) and row_data[i + 1] == quote_char:
-                    current_value += char + char
-                    i += 1
-                else:
-                    in_quotes = False
-                    quote_char = None
-                    current_value += char
-            elif not in_quotes and char == ',':
-                values.append(current_value.strip())
-                current_value = ''
-            else:
-                current_value += char
+            # Remove parentheses and trailing comma/semicolon
+            row_data = line[1:-2]
+            values = split_sql_row(row_data)
             
-            i += 1
-        
-        # Add the last value
-        if current_value.strip():
-            values.append(current_value.strip())
-        
-        # Extract job data if we have enough values (should be 21 for wp_mops_jobs)
-        if len(values) >= 15:
-            try:
-                total_val = parse_sql_value(values[11])
-                units_val = parse_sql_value(values[2])
-                
-                job = {
-                    'id': int(values[0]),
-                    'organisation_id': int(values[1]),
-                    'total': float(total_val) if total_val else 0.0,
-                    'units': int(units_val) if units_val else 0,
-                    'status': parse_sql_value(values[14]) or '',
-                    'completedDate': parse_datetime(parse_sql_value(values[13]))
-                }
-                jobs.append(job)
-            except (ValueError, IndexError, TypeError) as e:
-                continue
-    
-    return jobs
+            # Extract job data if we have enough values (should be 21 for wp_mops_jobs)
+            if len(values) >= 15:
+                try:
+                    total_val = parse_sql_value(values[11])
+                    units_val = parse_sql_value(values[2])
+                    
+                    yield {
+                        'id': int(values[0]),
+                        'organisation_id': int(values[1]),
+                        'total': float(total_val) if total_val else 0.0,
+                        'units': int(units_val) if units_val else 0,
+                        'status': parse_sql_value(values[14]) or '',
+                        'completedDate': parse_datetime(parse_sql_value(values[13]))
+                    }
+                except (ValueError, IndexError, TypeError):
+                    continue
+
+@disk_cached_stream('data/wp_mops_jobs.sql', PARSER_VERSION)
+def iter_cached_jobs():
+    """Yield jobs one at a time, from the extraction cache when the dump is unchanged"""
+    return iter_jobs()
+
+def extract_jobs():
+    """Extract jobs data from SQL file"""
+    return list(iter_cached_jobs())
 
 def geocode_address_nominatim(address):
     """Geocode address using OpenStreetMap Nominatim (free service)"""
@@ -237,6 +222,9 @@ def geocode_address_nominatim(address):
     if not 'Australia' in clean_address:
         clean_address += ', Australia'
     
+    # Imported here so cached and offline runs don't pay for requests at startup
+    import requests
+    
     try:
         # Use Nominatim API (free, but with rate limiting)
         url = 'https://nominatim.openstreetmap.org/search'
@@ -310,30 +298,48 @@ def postcode_to_state(postcode):
     else:
         return None
 
-def build_customer_mapping_data():
-    """Build the complete customer mapping JSON structure"""
+def iter_customer_mapping_data(organizations=None, regions=None, org_types=None, jobs=None,
+                               jobs_sorted=False, stats=None):
+    """Yield customer mapping records one at a time.
+
+    Jobs are streamed: ordered by organisation (an external sort unless
+    jobs_sorted says they already are) and merge-joined against the
+    organisations, so only one organisation's jobs are held at a time.
+    Any input not supplied is extracted from the SQL dumps in data/ via the
+    on-disk extraction cache.
+    Counters are written into the optional stats dict as records are built.
+    """
     # Extract all data
-    organizations = extract_organizations()
-    regions = extract_regions()
-    org_types = extract_organization_types()
-    jobs = extract_jobs()
+    if organizations is None:
+        organizations = extract_organizations()
+    if regions is None:
+        regions = extract_regions()
+    if org_types is None:
+        org_types = extract_organization_types()
+    if jobs is None:
+        # Streamed, from the extraction cache when it is warm
+        jobs = iter_cached_jobs()
+    if stats is None:
+        stats = {}
+    
+    # Merge duplicate organisations so revenue isn't split across them
+    organizations, alias_map = merge_organizations(organizations)
+    organizations.sort(key=lambda org: org['id'])
+    print(f"Merged {len(alias_map)} duplicate organisations")
     
-    # Group jobs by organization
-    jobs_by_org = {}
-    for job in jobs:
-        org_id = job['organisation_id']
-        if org_id not in jobs_by_org:
-            jobs_by_org[org_id] = []
-        jobs_by_org[org_id].append(job)
+    # Stream jobs ordered by their canonical organisation
+    def canonical_org_id(job):
+        return alias_map.get(job['organisation_id'], job['organisation_id'])
+    
+    ordered_jobs = sorted_by_key(jobs, canonical_org_id, presorted=jobs_sorted and not alias_map)
     
     # Build customer data
-    customers = []
-    states_fixed_count = 0
-    geocoded_count = 0
+    stats.update(states_fixed=0, geocoded=0, customers=0)
+    geocode_cache = {}
     
-    for org in organizations:
+    for org, org_jobs in merge_join(organizations, ordered_jobs,
+                                    lambda org: org['id'], canonical_org_id):
         org_id = org['id']
-        org_jobs = jobs_by_org.get(org_id, [])
         
         # Calculate total revenue
         total_revenue = sum(job['total'] for job in org_jobs)
@@ -409,18 +415,24 @@ def build_customer_mapping_data():
         if not clean_state:
             final_state = postcode_to_state(postcode)
             if final_state:
-                states_fixed_count += 1
+                stats['states_fixed'] += 1
 
         # Geocode ALL customers (both with and without jobs)
         lat, lng = None, None
-        if full_address and full_address.strip():
+        address_key = geocode_key(org)
+        if address_key in geocode_cache:
+            # Same canonical address already geocoded for another organisation
+            lat, lng = geocode_cache[address_key]
+        elif full_address and full_address.strip():
             job_info = f"({len(org_jobs)} jobs)" if org_jobs else "(no jobs)"
             print(f"Geocoding {org['title']} {job_info}...")
             # Rate limiting: pause between geocoding requests
             time.sleep(1)  # 1 second delay to respect API limits
             lat, lng = geocode_address_nominatim(full_address)
-            if lat and lng:
-                geocoded_count += 1
+            if address_key:
+                geocode_cache[address_key] = (lat, lng)
+        if lat and lng:
+            stats['geocoded'] += 1
 
         # Build customer object with geocoded coordinates
         customer = {
@@ -442,32 +454,46 @@ def build_customer_mapping_data():
             'region': region_name,
             'jobs': job_list,
             'totalRevenue': total_revenue,
-            'lastServiceDate': last_service_date
+            'lastServiceDate': last_service_date,
+            'mergedIds': org.get('merged_ids', [])
         }
         
-        customers.append(customer)
+        stats['customers'] += 1
+        yield customer
     
-    print(f"Fixed {states_fixed_count} customer states using postcode mapping")
-    print(f"Geocoded {geocoded_count} addresses with coordinates")
-    return customers
+    print(f"Fixed {stats['states_fixed']} customer states using postcode mapping")
+    print(f"Geocoded {stats['geocoded']} addresses with coordinates")
 
-# Test the functions
-if __name__ == "__main__":
+def build_customer_mapping_data(organizations=None, regions=None, org_types=None, jobs=None):
+    """Build the complete customer mapping JSON structure as a list"""
+    return list(iter_customer_mapping_data(organizations, regions, org_types, jobs))
+
+def main():
+    """Build customer_mapping_data.json from the SQL dumps."""
     print("Building customer mapping data...")
-    customers = build_customer_mapping_data()
+    stats = {}
+    summary = {'with_jobs': 0, 'revenue': 0.0, 'samples': []}
     
-    print(f"Built {len(customers)} customer records")
+    def track(customers):
+        """Collect statistics as customers stream past to the writer"""
+        for customer in customers:
+            if customer['jobs']:
+                summary['with_jobs'] += 1
+            summary['revenue'] += customer['totalRevenue']
+            if len(summary['samples']) < 5:
+                summary['samples'].append(customer)
+            yield customer
     
-    # Show some statistics
-    customers_with_jobs = [c for c in customers if c['jobs']]
-    total_revenue_all = sum(c['totalRevenue'] for c in customers)
+    # Customers are written one at a time so memory stays flat
+    write_json_array(track(iter_customer_mapping_data(stats=stats)), 'customer_mapping_data.json')
     
-    print(f"Customers with jobs: {len(customers_with_jobs)}")
-    print(f"Total revenue across all customers: ${total_revenue_all:,.2f}")
+    print(f"Built {stats['customers']} customer records")
+    print(f"Customers with jobs: {summary['with_jobs']}")
+    print(f"Total revenue across all customers: ${summary['revenue']:,.2f}")
     
     # Show sample customers
     print("\nSample customers:")
-    for customer in customers[:5]:
+    for customer in summary['samples']:
         print(f"ID: {customer['id']}")
         print(f"  Name: {customer['name']}")
         print(f"  Type: {customer['organizationType']}")
@@ -477,8 +503,7 @@ if __name__ == "__main__":
         print(f"  Last Service: {customer['lastServiceDate']}")
         print()
     
-    # Save to JSON file
-    with open('customer_mapping_data.json', 'w') as f:
-        json.dump(customers, f, indent=2, ensure_ascii=False)
-    
-    print(f"Customer mapping data saved to customer_mapping_data.json")
\ No newline at end of file
+    print(f"Customer mapping data saved to customer_mapping_data.json")
+
+if __name__ == "__main__":
+    main()
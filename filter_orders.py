@@ -4,8 +4,6 @@ Filter Orders Script
 Removes orders that have associated job_id since they're already in the app.
 """
 
-import pandas as pd
-
 def analyze_job_distribution(df):
     """Analyze the distribution of orders with/without job_id."""
     print("📊 Analyzing Job ID Distribution:")
@@ -48,6 +46,8 @@ def filter_orders(df):
 
 def main():
     """Main filtering function."""
+    import pandas as pd
+    
     input_file = '/Users/liam/customer-mapping-app/cleaned_orders.csv'
     output_file = '/Users/liam/customer-mapping-app/orders_no_jobs.csv'
     
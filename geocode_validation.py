@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Geocode Quality Validation
+Cross-checks each customer's coordinate against its stated state and the
+other customers in its postcode, finds distinct addresses collapsed onto one
+coordinate with a grid spatial index, and ranks flagged customers into a
+re-geocode queue so the geocoder budget goes where it improves accuracy.
+"""
+
+import sys
+import json
+import time
+
+from extract_data import postcode_to_state
+
+QUEUE_FILE = 'geocode_queue.json'
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Approximate state extents (south, north, west, east), padded by STATE_MARGIN
+STATE_BOUNDS = {
+    'NSW': (-37.6, -28.1, 140.9, 153.7),
+    'ACT': (-35.95, -35.1, 148.75, 149.45),
+    'VIC': (-39.2, -33.9, 140.9, 150.0),
+    'QLD': (-29.2, -9.1, 137.9, 153.6),
+    'SA': (-38.1, -25.9, 128.9, 141.0),
+    'WA': (-35.2, -13.6, 112.9, 129.1),
+    'TAS': (-43.7, -39.5, 143.8, 148.5),
+    'NT': (-26.1, -10.9, 128.9, 138.1),
+}
+STATE_MARGIN = 0.1
+
+# Postcode outliers: farther than this from the postcode median, and more than
+# OUTLIER_MAD_FACTOR median absolute deviations out
+OUTLIER_KM = 40.0
+OUTLIER_MAD_FACTOR = 4.0
+MIN_POSTCODE_POINTS = 3
+
+# Distinct addresses within this distance of each other count as a collision
+COLLISION_METRES = 15.0
+
+# Severity per flag; queue priority is the summed severity scaled by revenue
+SEVERITY = {
+    'missing': 3.0,
+    'state_mismatch': 5.0,
+    'postcode_outlier': 3.0,
+    'collision': 1.0,
+}
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km, element-wise over arrays"""
+    import numpy as np
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2.0) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+class GridIndex:
+    """Uniform lat/lng grid mapping cells to point indices for radius queries"""
+
+    def __init__(self, lats, lngs, cell_degrees):
+        import numpy as np
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.cell_degrees = cell_degrees
+        self.cells = {}
+        rows = np.floor(self.lats / cell_degrees).astype(np.int64)
+        cols = np.floor(self.lngs / cell_degrees).astype(np.int64)
+        for index, cell in enumerate(zip(rows.tolist(), cols.tolist())):
+            self.cells.setdefault(cell, []).append(index)
+
+    def neighbours(self, index, radius_km):
+        """Indices of other points within radius_km of point index.
+
+        radius_km must not exceed the cell size, so the 3x3 block of cells
+        around the point covers the search radius.
+        """
+        import numpy as np
+        row = int(np.floor(self.lats[index] / self.cell_degrees))
+        col = int(np.floor(self.lngs[index] / self.cell_degrees))
+        candidates = [other for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                      for other in self.cells.get((row + dr, col + dc), ()) if other != index]
+        if not candidates:
+            return []
+        candidates = np.array(candidates)
+        distances = haversine_km(self.lats[index], self.lngs[index],
+                                 self.lats[candidates], self.lngs[candidates])
+        return candidates[distances <= radius_km].tolist()
+
+def expected_state(customer):
+    """State implied by the postcode, falling back to the stated state"""
+    location = customer.get('location') or {}
+    return postcode_to_state(location.get('postcode')) or location.get('state')
+
+def in_state(lat, lng, state):
+    """Whether a coordinate falls inside the padded extent of a state"""
+    bounds = STATE_BOUNDS.get(state)
+    if not bounds:
+        return True
+    south, north, west, east = bounds
+    return (south - STATE_MARGIN <= lat <= north + STATE_MARGIN
+            and west - STATE_MARGIN <= lng <= east + STATE_MARGIN)
+
+def _normalised_address(customer):
+    """Address text used to tell distinct addresses apart"""
+    address = (customer.get('contact') or {}).get('address') or ''
+    return ' '.join(address.upper().replace(',', ' ').split())
+
+def postcode_outliers(customers, indices, lats, lngs):
+    """Map of customer index -> km from its postcode median, for outliers only"""
+    import numpy as np
+    by_postcode = {}
+    for index in indices:
+        postcode = ''.join(filter(str.isdigit, str((customers[index].get('location') or {}).get('postcode') or '')))
+        if postcode:
+            by_postcode.setdefault(postcode, []).append(index)
+
+    outliers = {}
+    for members in by_postcode.values():
+        if len(members) < MIN_POSTCODE_POINTS:
+            continue
+        members = np.array(members)
+        distances = haversine_km(np.median(lats[members]), np.median(lngs[members]),
+                                 lats[members], lngs[members])
+        mad = np.median(np.abs(distances - np.median(distances))) + 1e-9
+        flagged = (distances > OUTLIER_KM) & (distances > np.median(distances) + OUTLIER_MAD_FACTOR * mad)
+        outliers.update(zip(members[flagged].tolist(), distances[flagged].tolist()))
+    return outliers
+
+def coordinate_collisions(customers, indices, lats, lngs, radius_m=COLLISION_METRES):
+    """Map of customer index -> number of distinct addresses sharing its spot"""
+    index = GridIndex(lats[indices], lngs[indices], cell_degrees=0.01)
+    collisions = {}
+    for position, customer_index in enumerate(indices):
+        address = _normalised_address(customers[customer_index])
+        others = {_normalised_address(customers[indices[other]])
+                  for other in index.neighbours(position, radius_m / 1000.0)}
+        others.discard(address)
+        if others:
+            collisions[customer_index] = len(others) + 1
+    return collisions
+
+def customer_priority(customer):
+    """Revenue-based weight so valuable customers are re-geocoded first"""
+    import numpy as np
+    revenue = customer.get('combinedRevenue')
+    if revenue is None:
+        revenue = (customer.get('totalRevenue') or 0) + (customer.get('totalOrderRevenue') or 0)
+    return 1.0 + np.log1p(max(revenue, 0))
+
+def _geocoded_arrays(customers):
+    """Indices of geocoded customers plus full-length lat/lng arrays"""
+    import numpy as np
+    indices = [i for i, c in enumerate(customers)
+               if (c.get('location') or {}).get('lat') is not None
+               and (c.get('location') or {}).get('lng') is not None]
+    lats = np.full(len(customers), np.nan)
+    lngs = np.full(len(customers), np.nan)
+    for i in indices:
+        lats[i] = customers[i]['location']['lat']
+        lngs[i] = customers[i]['location']['lng']
+    return indices, lats, lngs
+
+def validate_geocodes(customers):
+    """Flag questionable coordinates and return the prioritised re-geocode queue.
+
+    Each queue entry carries the customer id, name, address, current
+    coordinate, the flags raised and a priority; entries are sorted with the
+    highest priority first.
+    """
+    indices, lats, lngs = _geocoded_arrays(customers)
+    flags = {}
+    for i, customer in enumerate(customers):
+        location = customer.get('location') or {}
+        if location.get('lat') is None or location.get('lng') is None:
+            if _normalised_address(customer):
+                flags.setdefault(i, {})['missing'] = True
+            continue
+        state = expected_state(customer)
+        if state and not in_state(lats[i], lngs[i], state):
+            flags.setdefault(i, {})['state_mismatch'] = state
+
+    if indices:
+        for i, distance in postcode_outliers(customers, indices, lats, lngs).items():
+            flags.setdefault(i, {})['postcode_outlier'] = round(distance, 1)
+        for i, count in coordinate_collisions(customers, indices, lats, lngs).items():
+            flags.setdefault(i, {})['collision'] = count
+
+    queue = []
+    for i, reasons in flags.items():
+        customer = customers[i]
+        severity = sum(SEVERITY[reason] for reason in reasons)
+        queue.append({
+            'id': customer['id'],
+            'name': customer.get('name'),
+            'address': (customer.get('contact') or {}).get('address'),
+            'lat': customer['location'].get('lat'),
+            'lng': customer['location'].get('lng'),
+            'flags': reasons,
+            'priority': round(severity * customer_priority(customer), 3),
+        })
+    queue.sort(key=lambda entry: (-entry['priority'], entry['id']))
+    return queue
+
+def regeocode(customers, queue, budget):
+    """Re-geocode up to budget queued customers, keeping only improved results.
+
+    A new coordinate is kept when it lies in the expected state and, for
+    customers flagged as postcode outliers, is nearer their postcode than
+    before. Returns the number of customers updated.
+    """
+    from extract_data import geocode_address_nominatim
+
+    by_id = {c['id']: c for c in customers}
+    position_of = {c['id']: i for i, c in enumerate(customers)}
+    updated = []
+    for entry in queue[:budget]:
+        customer = by_id.get(entry['id'])
+        if not customer or not entry['address']:
+            continue
+        time.sleep(1)  # Nominatim usage policy: one request per second
+        lat, lng = geocode_address_nominatim(entry['address'])
+        if lat is None or lng is None:
+            continue
+        state = expected_state(customer)
+        if state and not in_state(lat, lng, state):
+            continue
+        if entry['lat'] is not None and (lat, lng) == (entry['lat'], entry['lng']):
+            continue
+        customer['location']['lat'] = lat
+        customer['location']['lng'] = lng
+        updated.append(entry)
+
+    # Undo re-geocodes that moved a postcode outlier further out than before
+    if updated:
+        outliers = postcode_outliers(customers, *_geocoded_arrays(customers))
+        for entry in list(updated):
+            before = entry['flags'].get('postcode_outlier')
+            if before is not None and outliers.get(position_of[entry['id']], 0) > before:
+                customer = by_id[entry['id']]
+                customer['location']['lat'] = entry['lat']
+                customer['location']['lng'] = entry['lng']
+                updated.remove(entry)
+    return len(updated)
+
+def summarise(queue):
+    """Count queue entries per flag"""
+    counts = {}
+    for entry in queue:
+        for reason in entry['flags']:
+            counts[reason] = counts.get(reason, 0) + 1
+    return counts
+
+def main():
+    """Validate geocodes and write the re-geocode queue; --regeocode N spends N lookups."""
+    data_file = 'customer_mapping_data.json'
+    with open(data_file, 'r') as f:
+        customers = json.load(f)
+
+    print("🚀 Validating Geocodes")
+    print("=" * 40)
+    start = time.perf_counter()
+    queue = validate_geocodes(customers)
+    print(f"  ✅ Checked {len(customers)} customers in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for reason, count in sorted(summarise(queue).items()):
+        print(f"  - {reason}: {count}")
+
+    with open(QUEUE_FILE, 'w') as f:
+        json.dump(queue, f, indent=2)
+    print(f"  📝 {len(queue)} customers queued for re-geocoding in {QUEUE_FILE}")
+
+    if len(sys.argv) > 2 and sys.argv[1] == '--regeocode':
+        budget = int(sys.argv[2])
+        updated = regeocode(customers, queue, budget)
+        with open(data_file, 'w') as f:
+            json.dump(customers, f, indent=2, ensure_ascii=False, default=str)
+        print(f"  🌍 Re-geocoded {min(budget, len(queue))} customers, {updated} improved")
+
+if __name__ == "__main__":
+    main()
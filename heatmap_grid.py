@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Revenue Heatmap Grid
+Bins geocoded customers into multi-resolution geohash cells and aggregates
+job revenue, order revenue and customer counts per cell and year, writing
+the result as compact heatmap tiles. Binning is vectorised with NumPy and
+runs in parallel over chunks.
+"""
+
+import os
+import sys
+import json
+import time
+
+HEATMAP_DIR = 'heatmap'
+
+# Geohash precisions written (3 ~ 156 km, 4 ~ 39 km, 5 ~ 4.9 km, 6 ~ 1.2 km cells)
+PRECISIONS = (3, 4, 5, 6)
+
+# Tiles group cells by this many leading geohash characters
+TILE_PREFIX_LENGTH = 2
+
+# Rows per parallel chunk; smaller inputs are binned in-process
+CHUNK_SIZE = 200000
+
+# Time bucket 0 aggregates all activity regardless of date
+ALL_TIME_BUCKET = 0
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def geohash_cells(lat, lng, precision):
+    """Vectorised geohash of coordinate arrays, as integers of 5 * precision bits"""
+    import numpy as np
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+
+    lat_q = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64)
+    lng_q = np.floor((np.asarray(lng, dtype=np.float64) + 180.0) / 360.0 * (1 << lng_bits)).astype(np.int64)
+    lat_q = np.clip(lat_q, 0, (1 << lat_bits) - 1)
+    lng_q = np.clip(lng_q, 0, (1 << lng_bits) - 1)
+
+    # Interleave bits, longitude first, most significant bit first
+    cells = np.zeros(lat_q.shape, dtype=np.int64)
+    lng_index, lat_index = lng_bits - 1, lat_bits - 1
+    for bit in range(total_bits):
+        cells <<= 1
+        if bit % 2 == 0:
+            cells |= (lng_q >> lng_index) & 1
+            lng_index -= 1
+        else:
+            cells |= (lat_q >> lat_index) & 1
+            lat_index -= 1
+    return cells
+
+def geohash_string(cell, precision):
+    """Base32 geohash string for an integer cell"""
+    chars = []
+    for _ in range(precision):
+        chars.append(GEOHASH_ALPHABET[cell & 31])
+        cell >>= 5
+    return ''.join(reversed(chars))
+
+def _year(value):
+    """Year of an ISO-ish date string, or None"""
+    if not value:
+        return None
+    try:
+        year = int(str(value)[:4])
+    except ValueError:
+        return None
+    return year if 1900 < year < 2200 else None
+
+def customer_rows(customers):
+    """Flatten customers into (lat, lng, bucket, job revenue, order revenue) rows.
+
+    Each geocoded customer gets one all-time row plus one row per year with
+    activity, so a row counts exactly one customer in its cell and bucket.
+    """
+    import numpy as np
+    lat, lng, bucket, job_revenue, order_revenue = [], [], [], [], []
+    for customer in customers:
+        location = customer.get('location') or {}
+        if location.get('lat') is None or location.get('lng') is None:
+            continue
+
+        per_year = {}
+        for job in customer.get('jobs') or []:
+            year = _year(job.get('completedDate'))
+            if year:
+                per_year.setdefault(year, [0.0, 0.0])[0] += job.get('total') or 0
+        for order in customer.get('orders') or []:
+            year = _year(order.get('completed_date'))
+            if year:
+                per_year.setdefault(year, [0.0, 0.0])[1] += order.get('total') or 0
+
+        rows = [(ALL_TIME_BUCKET, customer.get('totalRevenue') or 0, customer.get('totalOrderRevenue') or 0)]
+        rows.extend((year, jobs_total, orders_total) for year, (jobs_total, orders_total) in per_year.items())
+        for row_bucket, row_jobs, row_orders in rows:
+            lat.append(location['lat'])
+            lng.append(location['lng'])
+            bucket.append(row_bucket)
+            job_revenue.append(row_jobs)
+            order_revenue.append(row_orders)
+
+    return {
+        'lat': np.array(lat, dtype=np.float64),
+        'lng': np.array(lng, dtype=np.float64),
+        'bucket': np.array(bucket, dtype=np.int64),
+        'jobRevenue': np.array(job_revenue, dtype=np.float64),
+        'orderRevenue': np.array(order_revenue, dtype=np.float64),
+    }
+
+def _aggregate(keys, job_revenue, order_revenue, counts):
+    """Sum values per unique key"""
+    import numpy as np
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return (unique_keys,
+            np.bincount(inverse, weights=job_revenue, minlength=len(unique_keys)),
+            np.bincount(inverse, weights=order_revenue, minlength=len(unique_keys)),
+            np.bincount(inverse, weights=counts, minlength=len(unique_keys)))
+
+def bin_chunk(args):
+    """Aggregate one chunk of rows into (cell, bucket) keys for every precision"""
+    import numpy as np
+    lat, lng, bucket, job_revenue, order_revenue = args
+    ones = np.ones(len(lat), dtype=np.float64)
+    results = {}
+    for precision in PRECISIONS:
+        cells = geohash_cells(lat, lng, precision)
+        # Years fit in 12 bits, so the key packs cell and bucket together
+        keys = (cells << 12) | bucket
+        results[precision] = _aggregate(keys, job_revenue, order_revenue, ones)
+    return results
+
+def build_heatmap(rows, workers=None, chunk_size=CHUNK_SIZE):
+    """Bin rows into every precision, in parallel chunks for large inputs.
+
+    Returns {precision: (keys, job revenue, order revenue, customer counts)}.
+    """
+    import numpy as np
+    total = len(rows['lat'])
+    chunks = [tuple(rows[name][start:start + chunk_size]
+                    for name in ('lat', 'lng', 'bucket', 'jobRevenue', 'orderRevenue'))
+              for start in range(0, max(total, 1), chunk_size)]
+
+    if len(chunks) == 1 or workers == 1:
+        partials = [bin_chunk(chunk) for chunk in chunks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(bin_chunk, chunks))
+
+    merged = {}
+    for precision in PRECISIONS:
+        parts = [partial[precision] for partial in partials]
+        if len(parts) == 1:
+            merged[precision] = parts[0]
+            continue
+        merged[precision] = _aggregate(*(np.concatenate([part[i] for part in parts]) for i in range(4)))
+    return merged
+
+def write_heatmap_tiles(heatmap, output_dir):
+    """Write one JSON-of-arrays tile per geohash prefix and precision, plus an index"""
+    import numpy as np
+    index = {'precisions': {}, 'allTimeBucket': ALL_TIME_BUCKET}
+    total_bytes = 0
+    for precision, (keys, job_revenue, order_revenue, counts) in heatmap.items():
+        precision_dir = os.path.join(output_dir, str(precision))
+        os.makedirs(precision_dir, exist_ok=True)
+        # Compressed variants are left for precompress to reuse or clean up
+        for stale in os.listdir(precision_dir):
+            if stale.endswith('.json'):
+                os.remove(os.path.join(precision_dir, stale))
+
+        cells = keys >> 12
+        buckets = keys & 0xFFF
+        tile_shift = 5 * (precision - min(TILE_PREFIX_LENGTH, precision))
+        tile_ids = cells >> tile_shift
+
+        tiles = {}
+        for tile_id in np.unique(tile_ids):
+            mask = tile_ids == tile_id
+            prefix = geohash_string(int(tile_id), min(TILE_PREFIX_LENGTH, precision))
+            tile = {
+                'precision': precision,
+                'cells': [geohash_string(int(cell), precision) for cell in cells[mask]],
+                'bucket': buckets[mask].tolist(),
+                'customers': counts[mask].astype(np.int64).tolist(),
+                'jobRevenue': np.round(job_revenue[mask], 2).tolist(),
+                'orderRevenue': np.round(order_revenue[mask], 2).tolist(),
+            }
+            encoded = json.dumps(tile, separators=(',', ':')).encode('utf-8')
+            with open(os.path.join(precision_dir, f"{prefix}.json"), 'wb') as f:
+                f.write(encoded)
+            tiles[prefix] = len(encoded)
+            total_bytes += len(encoded)
+
+        index['precisions'][str(precision)] = {
+            'tiles': tiles,
+            'buckets': sorted(set(buckets.tolist())),
+        }
+
+    with open(os.path.join(output_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+    return total_bytes
+
+def write_heatmap(customers, data_file, workers=None):
+    """Build heatmap tiles for the customers and write them next to the data file"""
+    output_dir = os.path.join(os.path.dirname(data_file), HEATMAP_DIR)
+    rows = customer_rows(customers)
+    heatmap = build_heatmap(rows, workers=workers)
+    total_bytes = write_heatmap_tiles(heatmap, output_dir)
+    print(f"  🔥 Heatmap: {len(rows['lat'])} rows binned into "
+          + ", ".join(f"p{p} {len(heatmap[p][0])} cells" for p in PRECISIONS)
+          + f" ({total_bytes / 1024:,.0f} KB of tiles)")
+    return heatmap
+
+def benchmark_heatmap(count=2000000):
+    """Time serial versus parallel binning on synthetic rows"""
+    import numpy as np
+    rng = np.random.default_rng(42)
+    rows = {
+        'lat': rng.uniform(-44, -10, count),
+        'lng': rng.uniform(113, 154, count),
+        'bucket': rng.integers(2018, 2026, count),
+        'jobRevenue': rng.exponential(500, count),
+        'orderRevenue': rng.exponential(300, count),
+    }
+    print(f"⏱️  Benchmarking heatmap binning with {count:,} rows")
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        build_heatmap(rows, workers=workers)
+        print(f"  - {workers} worker(s): {time.perf_counter() - start:.2f}s")
+
+def main():
+    """Write heatmap tiles for the enhanced dataset, or benchmark binning."""
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark_heatmap()
+        return
+
+    data_file = 'customer_mapping_data_enhanced.json'
+    print("🚀 Building Revenue Heatmap")
+    print("=" * 40)
+    with open(data_file, 'r') as f:
+        customers = json.load(f)
+    write_heatmap(customers, data_file)
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,20 @@ Integrate Orders into Customer Data
 Adds orders data to the customer mapping JSON and creates the enhanced dataset.
 """
 
+import os
 import json
-import pandas as pd
 from datetime import datetime
+from search_index import save_search_index, DEFAULT_INDEX_FILE
+from changefeed import write_changefeed
+from shard_data import write_shards
+from map_projection import write_marker_files
+from customer_metrics import add_customer_metrics
+from precompress import write_precompressed
 
 def load_data():
     """Load customer data and orders data."""
+    import pandas as pd
+    
     print("📂 Loading data...")
     
     # Load customer data
@@ -25,6 +33,8 @@ def load_data():
 
 def integrate_orders(customers, orders_df):
     """Integrate orders data into customer records."""
+    import pandas as pd
+    
     print("\n🔗 Integrating orders data...")
     
     # Convert orders to dictionary for faster lookup
@@ -45,6 +55,12 @@ def integrate_orders(customers, orders_df):
             }
             orders_by_org[org_id].append(order_dict)
     
+    # Fold orders placed against merged duplicate organisations into the canonical customer
+    for customer in customers:
+        for merged_id in customer.get('mergedIds', []):
+            if merged_id in orders_by_org:
+                orders_by_org.setdefault(customer['id'], []).extend(orders_by_org.pop(merged_id))
+    
     print(f"  📊 Orders grouped by {len(orders_by_org)} organizations")
     
     # Add orders to customer records
@@ -136,6 +152,28 @@ def save_enhanced_data(customers):
         json.dump(customers, f, indent=2, default=str)
     
     print("  ✅ Enhanced data saved successfully!")
+    
+    # Ship the typeahead search index alongside the enhanced data
+    index_file = os.path.join(os.path.dirname(output_file), DEFAULT_INDEX_FILE)
+    save_search_index(customers, index_file)
+    print(f"  ✅ Search index saved to: {index_file}")
+    
+    # Per-state, per-region and summary shards for lazy loading
+    write_shards(customers, output_file)
+    
+    # Slim columnar marker files for drawing the map
+    write_marker_files(customers, output_file)
+    
+    # Revenue density tiles for the heatmap view
+    from heatmap_grid import write_heatmap
+    write_heatmap(customers, output_file)
+    
+    # Record what changed since the previous build for hot-reloading consumers
+    manifest = write_changefeed(customers, output_file)
+    
+    # Precompressed variants of every artefact plus an integrity manifest
+    write_precompressed(output_file, manifest['build_id'])
+    
     return output_file
 
 def main():
@@ -149,6 +187,13 @@ def main():
     # Integrate orders
     enhanced_customers = integrate_orders(customers, orders_df)
     
+    # Precompute interaction recency and revenue size buckets
+    add_customer_metrics(enhanced_customers)
+    
+    # Split customers into revenue-balanced sales territories
+    from territory_clustering import assign_territories
+    assign_territories(enhanced_customers)
+    
     # Analyze segments
     segments = analyze_customer_segments(enhanced_customers)
     
@@ -0,0 +1,111 @@
+"""
+Lazy Pipeline Helpers
+Streaming building blocks for assembling customers without materialising
+every job: key ordering with an external-sort fallback, a merge-join of two
+key-ordered streams, and an incremental JSON array writer.
+"""
+
+import os
+import json
+import heapq
+import pickle
+import tempfile
+import textwrap
+from itertools import count
+
+# Records held in memory per sorted run before spilling to disk
+SORT_RUN_SIZE = 50000
+
+def _spill_run(run, directory):
+    """Write a sorted run to a temporary file and return its path"""
+    handle, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(handle, 'wb') as f:
+        for entry in run:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+def _read_run(path):
+    """Yield entries back from a spilled run"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def sorted_by_key(records, key, presorted=False, run_size=SORT_RUN_SIZE):
+    """Yield records ordered by key, stable for equal keys.
+
+    With presorted=True records stream straight through and an out-of-order
+    key raises ValueError. Otherwise records are sorted in runs of run_size;
+    a single run is yielded from memory, and larger inputs are spilled to
+    temporary files and k-way merged, so at most one run is held in memory.
+    """
+    if presorted:
+        last_key = None
+        for record in records:
+            record_key = key(record)
+            if last_key is not None and record_key < last_key:
+                raise ValueError(f"Input declared sorted but key {record_key!r} follows {last_key!r}")
+            last_key = record_key
+            yield record
+        return
+
+    sequence = count()
+    run = []
+    run_paths = []
+    with tempfile.TemporaryDirectory(prefix='customer-sort-') as directory:
+        for record in records:
+            run.append((key(record), next(sequence), record))
+            if len(run) >= run_size:
+                run.sort(key=lambda entry: entry[:2])
+                run_paths.append(_spill_run(run, directory))
+                run = []
+
+        run.sort(key=lambda entry: entry[:2])
+        if not run_paths:
+            for _, _, record in run:
+                yield record
+            return
+
+        if run:
+            run_paths.append(_spill_run(run, directory))
+        run = []
+        for _, _, record in heapq.merge(*(_read_run(path) for path in run_paths),
+                                        key=lambda entry: entry[:2]):
+            yield record
+
+def merge_join(left, right, left_key, right_key):
+    """Yield (left_record, [matching right records]) for two key-ordered streams.
+
+    Every left record is yielded once, with an empty list when nothing on the
+    right matches; right records whose key has no left record are skipped.
+    """
+    right = iter(right)
+    pending = next(right, None)
+    for left_record in left:
+        current_key = left_key(left_record)
+        while pending is not None and right_key(pending) < current_key:
+            pending = next(right, None)
+        matches = []
+        while pending is not None and right_key(pending) == current_key:
+            matches.append(pending)
+            pending = next(right, None)
+        yield left_record, matches
+
+def write_json_array(records, path, indent=2, ensure_ascii=False):
+    """Write records as a JSON array one element at a time.
+
+    Produces the same layout as json.dump(list(records), f, indent=indent)
+    without holding the list in memory. Returns the number of records.
+    """
+    written = 0
+    with open(path, 'w') as f:
+        f.write('[')
+        for record in records:
+            f.write(',\n' if written else '\n')
+            encoded = json.dumps(record, indent=indent, ensure_ascii=ensure_ascii, default=str)
+            f.write(textwrap.indent(encoded, ' ' * indent))
+            written += 1
+        f.write('\n]' if written else ']')
+    return written
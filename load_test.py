@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+API Load Test Harness
+Generates scaled copies of the enhanced dataset with the pipeline's JSON
+writer, starts server.js against each one and drives concurrent requests
+across every /api/customers and /api/states filter combination, recording
+latency percentiles, throughput and payload sizes into a per-build report.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_pipeline import write_json_array
+from changefeed import CHANGES_DIR, MANIFEST_FILE
+
+DATA_FILE = 'customer_mapping_data_enhanced.json'
+REPORT_DIR = 'load_reports'
+
+FILTER_TYPES = ('all', 'jobs_only', 'orders_only', 'both')
+ENDPOINTS = ('/api/customers', '/api/states')
+
+DEFAULT_SCALES = (1, 5, 20)
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS = 40
+DEFAULT_PORT = 3100
+
+# Large scaled datasets take a while for the server to parse at startup
+SERVER_START_TIMEOUT = 180
+
+# Credentials the harness starts the server with, so it exercises the real
+# session-authenticated path rather than development mode
+LOAD_TEST_USER = 'loadtest'
+LOAD_TEST_PASSWORD = 'loadtest'
+
+# Scaled copies get ids offset by multiples of this
+ID_STRIDE = 10000000
+
+def scaled_customers(customers, scale):
+    """Yield scale copies of the customers with fresh ids and nudged coordinates.
+
+    Each copy is shifted a few hundred metres so copies don't stack exactly,
+    while jobs and orders are shared between copies to keep memory flat.
+    """
+    for copy in range(scale):
+        offset = copy * 0.003
+        for customer in customers:
+            if copy == 0:
+                yield customer
+                continue
+            location = dict(customer.get('location') or {})
+            if location.get('lat') is not None and location.get('lng') is not None:
+                location['lat'] += offset
+                location['lng'] += offset
+            yield dict(customer, id=customer['id'] + copy * ID_STRIDE, location=location)
+
+def build_dataset(customers, scale, directory):
+    """Write a scaled dataset and return (path, customer count, bytes)"""
+    path = os.path.join(directory, f"customers_x{scale}.json")
+    count = write_json_array(scaled_customers(customers, scale), path)
+    return path, count, os.path.getsize(path)
+
+def request_paths():
+    """Every filter combination of the customer and state endpoints"""
+    return [f"{endpoint}?filterType={filter_type}&showNonCustomers={show}"
+            for endpoint in ENDPOINTS
+            for filter_type in FILTER_TYPES
+            for show in ('false', 'true')]
+
+def start_server(data_file, port, log_path):
+    """Start server.js on port against data_file and wait until it answers"""
+    env = dict(os.environ, PORT=str(port), CUSTOMER_DATA_FILE=os.path.abspath(data_file),
+               NODE_ENV='production', AUTH_USERNAME=LOAD_TEST_USER, AUTH_PASSWORD=LOAD_TEST_PASSWORD)
+    log = open(log_path, 'w')
+    process = subprocess.Popen(['node', 'server.js'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.close()
+            raise RuntimeError(f"server.js exited with code {process.returncode}; see {log_path}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/healthz')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process, log
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process, log)
+    raise RuntimeError(f"server.js did not answer on port {port} within {SERVER_START_TIMEOUT}s")
+
+def stop_server(process, log):
+    """Terminate the server and close its log"""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    log.close()
+
+def login(port):
+    """Log in and return the session cookie header value"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    body = json.dumps({'username': LOAD_TEST_USER, 'password': LOAD_TEST_PASSWORD})
+    connection.request('POST', '/api/login', body=body, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"Login failed with HTTP {response.status}")
+    cookie = response.getheader('Set-Cookie') or ''
+    connection.close()
+    return cookie.split(';', 1)[0]
+
+def _has_activity(customer):
+    """server.js: has jobs with revenue or orders with revenue"""
+    return bool((customer.get('jobs') and (customer.get('totalRevenue') or 0) > 0)
+                or (customer.get('orders') and (customer.get('totalOrderRevenue') or 0) > 0))
+
+def _is_non_customer(customer):
+    """server.js: no jobs (or zero job revenue) and no orders (or zero order revenue)"""
+    return bool((not customer.get('jobs') or customer.get('totalRevenue') == 0)
+                and (not customer.get('orders') or customer.get('totalOrderRevenue') == 0))
+
+def expected_all_count(customers):
+    """Records /api/customers?filterType=all&showNonCustomers=true should return"""
+    return sum(1 for c in customers if _has_activity(c)) + sum(1 for c in customers if _is_non_customer(c))
+
+def check_dataset_loaded(port, cookie, expected):
+    """Fail fast when server.js fell back to empty data instead of loading the dataset"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    connection.request('GET', '/api/customers?filterType=all&showNonCustomers=true',
+                       headers={'Cookie': cookie, 'Accept-Encoding': 'identity'})
+    response = connection.getresponse()
+    payload = response.read()
+    connection.close()
+    if response.status != 200:
+        raise RuntimeError(f"Dataset check failed with HTTP {response.status}")
+    served = len(json.loads(payload))
+    if served != expected:
+        raise RuntimeError(f"server.js served {served} customers, expected {expected}; "
+                           f"the dataset probably failed to load")
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def drive_endpoint(port, cookie, path, concurrency, total_requests):
+    """Send total_requests GETs for path from concurrency workers.
+
+    Each worker keeps its own keep-alive connection. Returns the endpoint's
+    latency percentiles (ms), throughput (req/s), payload size and errors.
+    """
+    local = threading.local()
+    headers = {'Cookie': cookie, 'Accept-Encoding': 'identity'}
+
+    def one_request(_):
+        if not hasattr(local, 'connection'):
+            local.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        start = time.perf_counter()
+        try:
+            local.connection.request('GET', path, headers=headers)
+            response = local.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            del local.connection
+            return None, 0
+        elapsed = (time.perf_counter() - start) * 1000
+        return (elapsed, len(payload)) if response.status == 200 else (None, 0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one_request, range(total_requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results if latency is not None)
+    sizes = [size for latency, size in results if latency is not None]
+    return {
+        'path': path,
+        'requests': total_requests,
+        'errors': total_requests - len(latencies),
+        'p50Ms': _round(percentile(latencies, 0.50)),
+        'p95Ms': _round(percentile(latencies, 0.95)),
+        'p99Ms': _round(percentile(latencies, 0.99)),
+        'throughputRps': round(len(latencies) / wall, 1) if wall > 0 else None,
+        'payloadBytes': max(sizes) if sizes else 0,
+    }
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+def build_info():
+    """Identify the build under test: git revision, server hash and data build.
+
+    The data build is the pipeline's changefeed build id when there is one,
+    otherwise the data file's hash, so two pipeline runs on the same code get
+    separate, comparable reports.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--', 'server.js'], cwd=root,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        revision, dirty = 'unknown', False
+
+    def digest(name):
+        with open(os.path.join(root, name), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    server_sha, data_sha = digest('server.js'), digest(DATA_FILE)
+    # Only trust the changefeed's build id if it was recorded for this data file
+    pipeline_build = None
+    changes_manifest = os.path.join(root, CHANGES_DIR, MANIFEST_FILE)
+    if os.path.exists(changes_manifest):
+        with open(changes_manifest, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('sha256') == data_sha:
+            pipeline_build = manifest.get('build_id')
+
+    return {
+        'buildId': f"{revision}{'-dirty' if dirty else ''}-{server_sha[:12]}-{pipeline_build or data_sha[:12]}",
+        'gitRevision': revision,
+        'serverSha256': server_sha[:12],
+        'dataSha256': data_sha[:12],
+        'pipelineBuildId': pipeline_build,
+        'generatedAt': datetime.now(timezone.utc).isoformat(),
+    }
+
+def run_load_test(scales=DEFAULT_SCALES, concurrency=DEFAULT_CONCURRENCY,
+                  requests_per_path=DEFAULT_REQUESTS, port=DEFAULT_PORT):
+    """Load test every scale and return the report"""
+    with open(DATA_FILE, 'r') as f:
+        customers = json.load(f)
+    expected_per_copy = expected_all_count(customers)
+
+    report = dict(build_info(), concurrency=concurrency, requestsPerPath=requests_per_path, scales=[])
+    directory = tempfile.mkdtemp(prefix='customer-load-')
+    try:
+        for scale in scales:
+            path, count, size = build_dataset(customers, scale, directory)
+            print(f"  📦 x{scale}: {count:,} customers, {size / 1024 / 1024:,.1f} MB")
+
+            start = time.perf_counter()
+            process, log = start_server(path, port, os.path.join(directory, f"server_x{scale}.log"))
+            startup = time.perf_counter() - start
+            try:
+                cookie = login(port)
+                check_dataset_loaded(port, cookie, expected_per_copy * scale)
+                endpoints = [drive_endpoint(port, cookie, request_path, concurrency, requests_per_path)
+                             for request_path in request_paths()]
+            finally:
+                stop_server(process, log)
+
+            report['scales'].append({
+                'scale': scale,
+                'customers': count,
+                'dataBytes': size,
+                'serverStartSeconds': round(startup, 2),
+                'endpoints': endpoints,
+            })
+            print_scale(report['scales'][-1])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return report
+
+def print_scale(result):
+    """Print one scale's endpoint table"""
+    print(f"     server ready in {result['serverStartSeconds']:.1f}s")
+    for endpoint in result['endpoints']:
+        print(f"     {endpoint['path']:58s} p50 {endpoint['p50Ms'] or 0:8.1f} ms  "
+              f"p95 {endpoint['p95Ms'] or 0:8.1f}  p99 {endpoint['p99Ms'] or 0:8.1f}  "
+              f"{endpoint['throughputRps'] or 0:7.1f} req/s  {endpoint['payloadBytes'] / 1024:9,.0f} KB"
+              + (f"  {endpoint['errors']} errors" if endpoint['errors'] else ""))
+
+def previous_report(report_dir, build_id):
+    """Most recent report from a different build, if any"""
+    if not os.path.isdir(report_dir):
+        return None
+    candidates = []
+    for name in os.listdir(report_dir):
+        if name.endswith('.json'):
+            with open(os.path.join(report_dir, name), 'r') as f:
+                other = json.load(f)
+            if other.get('buildId') != build_id:
+                candidates.append(other)
+    return max(candidates, key=lambda other: other['generatedAt'], default=None)
+
+def compare_reports(report, baseline):
+    """Print p95 change per endpoint and scale against a baseline report"""
+    baseline_p95 = {(scale['scale'], endpoint['path']): endpoint['p95Ms']
+                    for scale in baseline['scales'] for endpoint in scale['endpoints']}
+    print(f"\n📈 p95 versus build {baseline['buildId']}:")
+    for scale in report['scales']:
+        for endpoint in scale['endpoints']:
+            before = baseline_p95.get((scale['scale'], endpoint['path']))
+            if before and endpoint['p95Ms']:
+                change = (endpoint['p95Ms'] - before) / before * 100
+                print(f"  x{scale['scale']:<3d} {endpoint['path']:58s} {before:8.1f} -> {endpoint['p95Ms']:8.1f} ms "
+                      f"({change:+.0f}%)")
+
+def save_report(report, report_dir=REPORT_DIR):
+    """Write the report as <report dir>/<build id>.json"""
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"{report['buildId']}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+def _option(name, default):
+    """Value of a --name=value argument"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split('=', 1)[1]
+    return default
+
+def main():
+    """Load test the API at several dataset scales and save a per-build report."""
+    scales = tuple(int(s) for s in _option('scales', ','.join(map(str, DEFAULT_SCALES))).split(','))
+    concurrency = int(_option('concurrency', DEFAULT_CONCURRENCY))
+    requests_per_path = int(_option('requests', DEFAULT_REQUESTS))
+    port = int(_option('port', DEFAULT_PORT))
+
+    print("🚀 Load Testing Customer API")
+    print("=" * 40)
+    print(f"  scales {scales}, {concurrency} concurrent workers, {requests_per_path} requests per path")
+    report = run_load_test(scales, concurrency, requests_per_path, port)
+    path = save_report(report)
+    print(f"\n📝 Report for build {report['buildId']} saved to {path}")
+
+    baseline = previous_report(REPORT_DIR, report['buildId'])
+    if baseline:
+        compare_reports(report, baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Map Marker Projection
+Projects the enhanced dataset down to the fields the map needs to draw
+markers (id, lat, lng, type, recency, combined revenue) and writes them as
+compact columnar files: a JSON-of-arrays and a packed binary of typed arrays.
+"""
+
+import os
+import sys
+import json
+import time
+import gzip
+import struct
+from array import array
+from customer_metrics import last_interaction_day
+
+MARKERS_JSON_FILE = 'customer_markers.json'
+MARKERS_BIN_FILE = 'customer_markers.bin'
+
+# Binary layout: header, then little-endian columns in this order. 4-byte
+# columns come first so each can be viewed directly as a JS TypedArray.
+BINARY_MAGIC = b'CMMK'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHI')  # magic, version, reserved, count
+BINARY_COLUMNS = (
+    ('id', 'i'),
+    ('lat', 'f'),
+    ('lng', 'f'),
+    ('revenue', 'f'),
+    ('lastInteractionDay', 'i'),
+    ('type', 'B'),
+    ('flags', 'B'),
+)
+
+ORGANIZATION_TYPES = ['school', 'university', 'industry', 'other']
+
+# Bits in the flags column
+FLAG_HAS_JOBS = 1
+FLAG_HAS_ORDERS = 2
+
+def project_markers(customers):
+    """Return a dict of column lists for every geocoded customer"""
+    columns = {name: [] for name, _ in BINARY_COLUMNS}
+    for customer in customers:
+        location = customer.get('location') or {}
+        lat, lng = location.get('lat'), location.get('lng')
+        if lat is None or lng is None:
+            continue
+
+        job_revenue = customer.get('totalRevenue') or 0
+        order_revenue = customer.get('totalOrderRevenue') or 0
+        flags = 0
+        if customer.get('jobs') and job_revenue > 0:
+            flags |= FLAG_HAS_JOBS
+        if customer.get('orders') and order_revenue > 0:
+            flags |= FLAG_HAS_ORDERS
+
+        org_type = customer.get('organizationType')
+        columns['id'].append(customer['id'])
+        columns['lat'].append(round(lat, 5))
+        columns['lng'].append(round(lng, 5))
+        columns['revenue'].append(round(job_revenue + order_revenue, 2))
+        interaction_day = customer.get('lastInteractionDay')
+        if interaction_day is None:
+            interaction_day = last_interaction_day(customer)
+        columns['lastInteractionDay'].append(interaction_day)
+        columns['type'].append(ORGANIZATION_TYPES.index(org_type) if org_type in ORGANIZATION_TYPES
+                               else ORGANIZATION_TYPES.index('other'))
+        columns['flags'].append(flags)
+    return columns
+
+def encode_json(columns):
+    """Encode columns as a compact JSON-of-arrays"""
+    payload = {'types': ORGANIZATION_TYPES, 'count': len(columns['id'])}
+    payload.update(columns)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def encode_binary(columns):
+    """Pack columns into the binary marker format"""
+    count = len(columns['id'])
+    parts = [BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, count)]
+    for name, typecode in BINARY_COLUMNS:
+        packed = array(typecode, columns[name])
+        if sys.byteorder != 'little':
+            packed.byteswap()
+        parts.append(packed.tobytes())
+    return b''.join(parts)
+
+def decode_binary(data):
+    """Unpack the binary marker format into a dict of arrays"""
+    magic, version, _, count = BINARY_HEADER.unpack_from(data, 0)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"Unsupported marker file: {magic!r} v{version}")
+    offset = BINARY_HEADER.size
+    columns = {}
+    for name, typecode in BINARY_COLUMNS:
+        column = array(typecode)
+        size = column.itemsize * count
+        column.frombytes(data[offset:offset + size])
+        if sys.byteorder != 'little':
+            column.byteswap()
+        columns[name] = column
+        offset += size
+    return columns
+
+def write_marker_files(customers, data_file):
+    """Write the JSON and binary marker files next to the data file"""
+    columns = project_markers(customers)
+    output_dir = os.path.dirname(data_file)
+    outputs = {}
+    for filename, encoded in ((MARKERS_JSON_FILE, encode_json(columns)),
+                              (MARKERS_BIN_FILE, encode_binary(columns))):
+        path = os.path.join(output_dir, filename)
+        with open(path, 'wb') as f:
+            f.write(encoded)
+        outputs[filename] = len(encoded)
+
+    full = os.path.getsize(data_file)
+    print(f"  🗺️  Wrote {len(columns['id'])} markers: "
+          + ", ".join(f"{name} {size / 1024:,.0f} KB ({full / size:.0f}x smaller)"
+                      for name, size in outputs.items()))
+    return outputs
+
+def _time_decode(func, payload, repeat=20):
+    """Best-of-N decode time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def benchmark_projection(data_file):
+    """Compare payload size and decode time of the full data against the marker files"""
+    with open(data_file, 'rb') as f:
+        full_payload = f.read()
+    customers = json.loads(full_payload)
+    columns = project_markers(customers)
+    payloads = [
+        ('full JSON', full_payload, json.loads),
+        ('markers JSON', encode_json(columns), json.loads),
+        ('markers binary', encode_binary(columns), decode_binary),
+    ]
+
+    print(f"⏱️  Benchmarking marker projection ({len(customers)} customers, "
+          f"{len(columns['id'])} markers)")
+    full_size = len(full_payload)
+    for name, payload, decode in payloads:
+        gzipped = len(gzip.compress(payload, 6))
+        print(f"  - {name:15s} {len(payload) / 1024:8,.0f} KB "
+              f"({full_size / len(payload):5.1f}x)  gzip {gzipped / 1024:6,.0f} KB  "
+              f"decode {_time_decode(decode, payload):7.2f} ms")
+
+def main():
+    """Write marker files for the enhanced dataset, or benchmark them."""
+    data_file = 'customer_mapping_data_enhanced.json'
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark_projection(data_file)
+        return
+
+    print("🚀 Writing Map Marker Projection")
+    print("=" * 40)
+    with open(data_file, 'r') as f:
+        customers = json.load(f)
+    write_marker_files(customers, data_file)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Precompressed Artefacts
+Writes gzip (and brotli, when the module is installed) variants next to each
+pipeline output, plus an integrity manifest of sizes, SHA-256 hashes and the
+build id, so deploys and clients can pick the smallest encoding with no
+compression work at request time and caches can key on content hashes.
+"""
+
+import os
+import sys
+import json
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+from search_index import DEFAULT_INDEX_FILE
+from map_projection import MARKERS_JSON_FILE, MARKERS_BIN_FILE
+from shard_data import SHARDS_DIR
+from heatmap_grid import HEATMAP_DIR
+from changefeed import CHANGES_DIR, MANIFEST_FILE, STATE_PREFIX
+
+ARTEFACT_MANIFEST_FILE = 'artefact_manifest.json'
+
+# Outputs written next to the enhanced data file; directories are walked
+ARTEFACT_FILES = (
+    'customer_mapping_data_enhanced.json',
+    DEFAULT_INDEX_FILE,
+    MARKERS_JSON_FILE,
+    MARKERS_BIN_FILE,
+)
+ARTEFACT_DIRS = (SHARDS_DIR, HEATMAP_DIR, CHANGES_DIR)
+
+COMPRESSIBLE_EXTENSIONS = ('.json', '.bin')
+ENCODING_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+CONTENT_TYPES = {'.json': 'application/json', '.bin': 'application/octet-stream'}
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+def available_encodings():
+    """Encodings this interpreter can produce, gzip always first"""
+    return ['gzip'] + (['br'] if brotli is not None else [])
+
+def compress(data, encoding):
+    """Compress bytes deterministically, so unchanged inputs give identical variants"""
+    if encoding == 'gzip':
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def sha256_hex(data):
+    """Hex SHA-256 of bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def _is_internal(relative):
+    """Whether a file is pipeline state rather than a shipped artefact"""
+    directory, name = os.path.split(relative)
+    return directory == CHANGES_DIR and name.startswith(STATE_PREFIX)
+
+def artefact_paths(output_dir):
+    """Relative paths of every shipped artefact under output_dir, sorted"""
+    paths = [name for name in ARTEFACT_FILES if os.path.isfile(os.path.join(output_dir, name))]
+    for directory in ARTEFACT_DIRS:
+        for root, _, files in os.walk(os.path.join(output_dir, directory)):
+            for name in files:
+                relative = os.path.relpath(os.path.join(root, name), output_dir)
+                if name.endswith(COMPRESSIBLE_EXTENSIONS) and not _is_internal(relative):
+                    paths.append(relative)
+    return sorted(paths)
+
+def _precompress_one(output_dir, relative, previous, encodings):
+    """Hash one artefact and write its compressed variants.
+
+    Variants are reused when the previous manifest shows the same content
+    hash and the variant file is still on disk. A variant that would not be
+    smaller than the original is not kept.
+    """
+    path = os.path.join(output_dir, relative)
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = sha256_hex(data)
+    entry = {
+        'bytes': len(data),
+        'sha256': digest,
+        'contentType': CONTENT_TYPES.get(os.path.splitext(relative)[1], 'application/octet-stream'),
+        'encodings': {},
+    }
+
+    reused = 0
+    for encoding in encodings:
+        variant = relative + ENCODING_SUFFIXES[encoding]
+        variant_path = os.path.join(output_dir, variant)
+        known = (previous or {}).get('encodings', {}).get(encoding)
+        if (previous or {}).get('sha256') == digest and known and os.path.exists(variant_path):
+            entry['encodings'][encoding] = known
+            reused += 1
+            continue
+
+        compressed = compress(data, encoding)
+        if len(compressed) >= len(data):
+            if os.path.exists(variant_path):
+                os.remove(variant_path)
+            continue
+        tmp_path = f"{variant_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, variant_path)
+        entry['encodings'][encoding] = {
+            'file': variant,
+            'bytes': len(compressed),
+            'sha256': sha256_hex(compressed),
+        }
+    return relative, entry, reused
+
+def _remove_orphaned_variants(output_dir, live):
+    """Delete .gz/.br files whose original artefact no longer exists"""
+    removed = 0
+    for directory in ('',) + ARTEFACT_DIRS:
+        root_dir = os.path.join(output_dir, directory)
+        if not os.path.isdir(root_dir):
+            continue
+        walker = os.walk(root_dir) if directory else [(root_dir, [], os.listdir(root_dir))]
+        for root, _, files in walker:
+            for name in files:
+                if not name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                    continue
+                relative = os.path.relpath(os.path.join(root, name), output_dir)
+                original = os.path.splitext(relative)[0]
+                if not directory and original not in ARTEFACT_FILES:
+                    continue  # Leave unrelated top-level files alone
+                if original not in live:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+    return removed
+
+def write_precompressed(data_file, build_id=None, workers=None):
+    """Precompress every artefact next to data_file and write the manifest.
+
+    Returns the manifest: build id, generation time, available encodings and
+    per-file sizes and hashes for the original and each compressed variant.
+    """
+    output_dir = os.path.dirname(data_file) or '.'
+    manifest_path = os.path.join(output_dir, ARTEFACT_MANIFEST_FILE)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            previous = json.load(f).get('files', {})
+
+    encodings = available_encodings()
+    relatives = artefact_paths(output_dir)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda relative: _precompress_one(output_dir, relative, previous.get(relative), encodings),
+            relatives))
+
+    files = {relative: entry for relative, entry, _ in results}
+    reused = sum(count for _, _, count in results)
+    orphans = _remove_orphaned_variants(output_dir, set(files))
+
+    manifest = {
+        'buildId': build_id,
+        'generatedAt': datetime.now(timezone.utc).isoformat(),
+        'encodings': encodings,
+        'files': files,
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    original = sum(entry['bytes'] for entry in files.values())
+    summary = [f"{len(files)} artefacts {original / 1024:,.0f} KB"]
+    for encoding in encodings:
+        smallest = sum(entry['encodings'].get(encoding, entry)['bytes'] for entry in files.values())
+        summary.append(f"{encoding} {smallest / 1024:,.0f} KB")
+    print(f"  🗜️  Precompressed {', '.join(summary)}"
+          + (f" ({reused} variants reused)" if reused else "")
+          + (f", removed {orphans} orphaned variants" if orphans else "")
+          + ("" if brotli is not None else " - install brotli for .br variants"))
+    return manifest
+
+def verify_manifest(data_file):
+    """Re-hash every artefact and variant, returning a list of mismatches"""
+    output_dir = os.path.dirname(data_file) or '.'
+    with open(os.path.join(output_dir, ARTEFACT_MANIFEST_FILE), 'r') as f:
+        manifest = json.load(f)
+
+    problems = []
+    for relative, entry in manifest['files'].items():
+        checks = [(relative, entry)] + [(variant['file'], variant) for variant in entry['encodings'].values()]
+        for path, expected in checks:
+            full_path = os.path.join(output_dir, path)
+            if not os.path.exists(full_path):
+                problems.append(f"{path}: missing")
+                continue
+            with open(full_path, 'rb') as f:
+                data = f.read()
+            if len(data) != expected['bytes'] or sha256_hex(data) != expected['sha256']:
+                problems.append(f"{path}: size or hash mismatch")
+    return problems
+
+def main():
+    """Precompress the pipeline outputs, or --verify them against the manifest."""
+    data_file = 'customer_mapping_data_enhanced.json'
+    if len(sys.argv) > 1 and sys.argv[1] == '--verify':
+        problems = verify_manifest(data_file)
+        for problem in problems:
+            print(f"  ❌ {problem}")
+        print("  ✅ All artefacts match the manifest" if not problems else f"  {len(problems)} problems found")
+        sys.exit(1 if problems else 0)
+
+    build_id = None
+    changes_manifest = os.path.join(os.path.dirname(data_file), CHANGES_DIR, MANIFEST_FILE)
+    if os.path.exists(changes_manifest):
+        with open(changes_manifest, 'r') as f:
+            build_id = json.load(f).get('build_id')
+    write_precompressed(data_file, build_id)
+
+if __name__ == "__main__":
+    main()
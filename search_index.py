@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Customer Search Index
+Builds a compact prefix/trigram search index over organisation name, suburb,
+postcode and email domain at pipeline time, and provides the query API used
+for typeahead lookups.
+"""
+
+import gc
+import re
+import sys
+import math
+import json
+import time
+import heapq
+import random
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from itertools import chain, islice
+
+INDEX_VERSION = 2
+DEFAULT_INDEX_FILE = 'customer_search_index.json'
+
+# Bounds that keep a query's work independent of dataset size
+MAX_SCAN = 2048
+# Prefixes spanning more vocabulary terms than this (the first keystrokes)
+# get their best-ranked documents precomputed instead of merged per query
+MAX_PREFIX_TERMS = 64
+PREFIX_TOP_DOCS = 256
+# Postings lists a single query token may merge
+MAX_MERGE_STREAMS = 64
+MATCHES_PER_RESULT = 4
+MAX_FUZZY_TERMS = 8
+FUZZY_THRESHOLD = 0.5
+
+# Score for how a query token matched a document token
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+NAME_FIELD_BONUS = 0.5
+
+def tokenize(text):
+    """Lowercase and split text into alphanumeric tokens"""
+    if not text:
+        return []
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+def trigrams(term):
+    """Return the set of padded character trigrams for a term"""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def email_domain(email):
+    """Return the domain part of an email address"""
+    if not email or '@' not in email:
+        return ''
+    return email.rsplit('@', 1)[1].strip().lower()
+
+def _combined_revenue(customer):
+    """Jobs plus orders revenue for ranking"""
+    return (customer.get('totalRevenue') or 0) + (customer.get('totalOrderRevenue') or 0)
+
+def _document_tokens(doc):
+    """Return (name tokens, other field tokens) for a document row"""
+    _, name, city, _, postcode, domain = doc
+    other_tokens = set(tokenize(city)) | set(tokenize(postcode))
+    if domain:
+        other_tokens.add(domain)
+        other_tokens.update(tokenize(domain))
+    return set(tokenize(name)), other_tokens
+
+def _merge_unique(streams, limit):
+    """First limit distinct values of sorted streams merged together"""
+    merged = []
+    last = None
+    for value in heapq.merge(*streams):
+        if value != last:
+            merged.append(value)
+            last = value
+            if len(merged) >= limit:
+                break
+    return merged
+
+def prefix_top_docs(terms, postings, max_terms=MAX_PREFIX_TERMS, limit=PREFIX_TOP_DOCS):
+    """Best-ranked documents for every prefix spanning more than max_terms terms.
+
+    Built bottom-up: a prefix merges the lists of its wide child prefixes and
+    the postings of its narrow ones, so no step merges more than one level.
+    """
+    top_docs = {}
+
+    def visit(prefix, start, end):
+        """Top docs of terms[start:end], which all start with prefix"""
+        if end - start <= max_terms:
+            return _merge_unique([postings[i][:limit] for i in range(start, end)], limit)
+        streams = []
+        i = start
+        if terms[i] == prefix:
+            streams.append(postings[i][:limit])
+            i += 1
+        while i < end:
+            child = prefix + terms[i][len(prefix)]
+            j = bisect_left(terms, child + '\uffff', i, end)
+            streams.append(visit(child, i, j))
+            i = j
+        top_docs[prefix] = _merge_unique(streams, limit)
+        return top_docs[prefix]
+
+    i = 0
+    while i < len(terms):
+        first = terms[i][0]
+        j = bisect_left(terms, first + '\uffff', i)
+        visit(first, i, j)
+        i = j
+    return top_docs
+
+def build_search_index(customers):
+    """Build the search index structure for a list of customer records.
+
+    Documents are numbered in descending revenue order, so every postings
+    list is already sorted best-first and queries can stop early. Prefixes
+    too broad to merge at query time carry a precomputed top-docs list.
+    """
+    ranked = sorted(customers, key=lambda c: (-_combined_revenue(c), c.get('name') or ''))
+
+    docs = []
+    postings = defaultdict(list)
+    for doc_idx, customer in enumerate(ranked):
+        location = customer.get('location') or {}
+        contact = customer.get('contact') or {}
+        doc = [
+            customer['id'],
+            customer.get('name') or '',
+            location.get('city') or '',
+            location.get('state') or '',
+            location.get('postcode') or '',
+            email_domain(contact.get('email')),
+        ]
+        docs.append(doc)
+
+        name_tokens, other_tokens = _document_tokens(doc)
+        for token in name_tokens | other_tokens:
+            postings[token].append(doc_idx)
+
+    terms = sorted(postings)
+    postings = [postings[term] for term in terms]
+    return {
+        'version': INDEX_VERSION,
+        'docs': docs,
+        'terms': terms,
+        'postings': postings,
+        'prefix_docs': prefix_top_docs(terms, postings),
+    }
+
+def save_search_index(customers, output_file):
+    """Build and write the search index next to the enhanced data"""
+    index = build_search_index(customers)
+    with open(output_file, 'w') as f:
+        json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+    return output_file
+
+class SearchIndex:
+    """Query API over a built search index"""
+
+    def __init__(self, index):
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version: {index.get('version')}")
+        self.docs = index['docs']
+        self.terms = index['terms']
+        self.postings = index['postings']
+        self.prefix_docs = index['prefix_docs']
+        # Cumulative postings lengths, so a prefix range's size is O(1)
+        self._posting_offsets = [0]
+        for postings in self.postings:
+            self._posting_offsets.append(self._posting_offsets[-1] + len(postings))
+        self._doc_tokens = {}
+        # Broad prefix -> its split streams; bounded by the number of broad prefixes
+        self._split_streams = {}
+        # gram -> term size in grams -> term indexes; built up front so the
+        # first fuzzy query costs the same as the rest
+        self._trigram_terms = defaultdict(dict)
+        for term_idx, term in enumerate(self.terms):
+            grams = trigrams(term)
+            for gram in grams:
+                self._trigram_terms[gram].setdefault(len(grams), []).append(term_idx)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_FILE):
+        """Load a search index file written by save_search_index()"""
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_customers(cls, customers):
+        """Build an in-memory index directly from customer records"""
+        return cls(build_search_index(customers))
+
+    def _prefix_range(self, token):
+        """(start, end) indexes of the vocabulary terms starting with token"""
+        return bisect_left(self.terms, token), bisect_left(self.terms, token + '\uffff')
+
+    def _fuzzy_terms(self, token):
+        """Indexes of vocabulary terms similar to token by trigram overlap.
+
+        Terms are grouped by their number of grams, which fixes how many of
+        the query's grams each must share to reach the Dice threshold, so
+        sizes that can't qualify are never read.
+        """
+        query_grams = trigrams(token)
+        query_size = len(query_grams)
+        by_gram = [self._trigram_terms.get(gram, {}) for gram in query_grams]
+
+        scored = []
+        for term_size in range(1, 3 * query_size + 1):
+            # Shared grams needed for dice = 2 * shared / (query + term) >= threshold
+            needed = math.ceil(FUZZY_THRESHOLD * (query_size + term_size) / 2.0)
+            if needed > min(query_size, term_size):
+                continue
+            lists = [buckets[term_size] for buckets in by_gram if term_size in buckets]
+            if len(lists) < needed:
+                continue
+            for term_idx, shared in Counter(chain.from_iterable(lists)).items():
+                if shared >= needed:
+                    scored.append((2.0 * shared / (query_size + term_size), term_idx))
+        return [term_idx for _, term_idx in heapq.nlargest(MAX_FUZZY_TERMS, scored)]
+
+    def _expand(self, token):
+        """Vocabulary terms a query token matches: its whole prefix range, or
+        fuzzy terms when nothing starts with it.
+
+        Returns (token, term indexes, fuzzy terms, total postings), or None
+        when the token matches nothing.
+        """
+        start, end = self._prefix_range(token)
+        if start < end:
+            return token, range(start, end), frozenset(), self._postings_between(start, end)
+        if len(token) >= 3:
+            fuzzy = self._fuzzy_terms(token)
+            if fuzzy:
+                return (token, fuzzy, frozenset(self.terms[t] for t in fuzzy),
+                        sum(len(self.postings[t]) for t in fuzzy))
+        return None
+
+    def _children(self, prefix, start, end):
+        """(child prefix, start, end) for each one-character extension of a prefix"""
+        i = start + (self.terms[start] == prefix)
+        while i < end:
+            child = prefix + self.terms[i][len(prefix)]
+            j = bisect_left(self.terms, child + '\uffff', i, end)
+            yield child, i, j
+            i = j
+
+    def _prefix_streams(self, token, start, end, budget=MAX_MERGE_STREAMS):
+        """Postings streams covering a broad prefix, at most budget of them.
+
+        Broad prefixes are split into their children, the largest first, as
+        long as the stream count stays within budget; a prefix that can't be
+        split any further is read through its precomputed top docs. Narrow
+        prefixes contribute the postings of each of their terms.
+        """
+        streams = []
+        pending = [(-self._postings_between(start, end), token, start, end)]
+        while pending:
+            _, prefix, start, end = heapq.heappop(pending)
+            children = list(self._children(prefix, start, end))
+            split_size = (self.terms[start] == prefix) + sum(
+                1 if child in self.prefix_docs else j - i for child, i, j in children)
+            if len(streams) + len(pending) + split_size > budget:
+                streams.append(self.prefix_docs[prefix])
+                continue
+            if self.terms[start] == prefix:
+                streams.append(self.postings[start])
+            for child, i, j in children:
+                if child in self.prefix_docs:
+                    heapq.heappush(pending, (-self._postings_between(i, j), child, i, j))
+                else:
+                    streams.extend(self.postings[i:j])
+        return streams
+
+    def _postings_between(self, start, end):
+        """Total postings of terms[start:end]"""
+        return self._posting_offsets[end] - self._posting_offsets[start]
+
+    def _candidates(self, expansion):
+        """Yield document indexes matching an expanded token, best-ranked first.
+
+        A broad prefix's precomputed top docs are exactly the start of its
+        stream; only a query that reads past them merges the prefix split
+        into at most MAX_MERGE_STREAMS streams, so the work doesn't grow
+        with the vocabulary.
+        """
+        token, term_indexes, fuzzy, _ = expansion
+        top_docs = None if fuzzy else self.prefix_docs.get(token)
+        if top_docs is None:
+            streams = [self.postings[term_idx] for term_idx in term_indexes]
+        else:
+            yield from top_docs
+            if len(top_docs) < PREFIX_TOP_DOCS:
+                return
+            seen = top_docs[-1]
+            split = self._split_streams.get(token)
+            if split is None:
+                split = self._prefix_streams(token, term_indexes.start, term_indexes.stop)
+                self._split_streams[token] = split
+            streams = [islice(stream, bisect_right(stream, seen), None) for stream in split]
+        if len(streams) == 1:
+            yield from streams[0]
+            return
+        last = None
+        for doc_idx in heapq.merge(*streams):
+            if doc_idx != last:
+                last = doc_idx
+                yield doc_idx
+
+    def _score(self, doc_idx, expansions):
+        """Sum of best per-token match scores, or 0.0 if any token is unmatched.
+
+        A name token scores NAME_FIELD_BONUS above the same match in another
+        field; exact matches are set lookups, so only partial ones loop.
+        """
+        name_tokens, other_tokens = self._tokens_of(doc_idx)
+        score = 0.0
+        for token, _, fuzzy, _ in expansions:
+            if token in name_tokens:
+                score += EXACT_SCORE + NAME_FIELD_BONUS
+                continue
+            best = 0.0
+            for doc_token in name_tokens:
+                if doc_token.startswith(token):
+                    best = PREFIX_SCORE + NAME_FIELD_BONUS
+                    break
+                if doc_token in fuzzy:
+                    best = FUZZY_SCORE + NAME_FIELD_BONUS
+            if token in other_tokens:
+                best = max(best, EXACT_SCORE)
+            elif best < PREFIX_SCORE:
+                for doc_token in other_tokens:
+                    if doc_token.startswith(token):
+                        best = PREFIX_SCORE
+                        break
+                    if doc_token in fuzzy:
+                        best = max(best, FUZZY_SCORE)
+            if best == 0.0:
+                return 0.0
+            score += best
+        return score
+
+    def _tokens_of(self, doc_idx):
+        """Token sets of a document (cached) used to verify the other query tokens"""
+        tokens = self._doc_tokens.get(doc_idx)
+        if tokens is None:
+            tokens = _document_tokens(self.docs[doc_idx])
+            self._doc_tokens[doc_idx] = tokens
+        return tokens
+
+    def search(self, query, limit=10):
+        """Return up to limit ranked matches for a typeahead query.
+
+        Every query token must match (exactly, by prefix or fuzzily) a token
+        of the document. Results are dicts with id, name, city, state,
+        postcode and score.
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        expansions = [self._expand(token) for token in query_tokens]
+        if any(expansion is None for expansion in expansions):
+            return []
+
+        # Drive candidate generation from the most selective token and stop
+        # once enough matches are found, since candidates arrive best-ranked first
+        driver = min(expansions, key=lambda expansion: expansion[3])
+        wanted = limit * MATCHES_PER_RESULT
+
+        results = []
+        for rank, doc_idx in enumerate(self._candidates(driver)):
+            if rank >= MAX_SCAN:
+                break
+            score = self._score(doc_idx, expansions)
+            if score:
+                results.append((-score, rank, doc_idx))
+                if len(results) >= wanted:
+                    break
+
+        results.sort()
+        matches = []
+        for neg_score, _, doc_idx in results[:limit]:
+            customer_id, name, city, state, postcode, _ = self.docs[doc_idx]
+            matches.append({
+                'id': customer_id,
+                'name': name,
+                'city': city,
+                'state': state,
+                'postcode': postcode,
+                'score': -neg_score,
+            })
+        return matches
+
+def _synthetic_customers(count, seed=42):
+    """Generate synthetic customer records for benchmarking"""
+    rng = random.Random(seed)
+    words = ['Saint', 'Mary', 'John', 'Grace', 'Christian', 'Catholic', 'State', 'High',
+             'Secondary', 'Primary', 'Public', 'Lutheran', 'Anglican', 'Girls', 'Boys',
+             'Valley', 'River', 'Mount', 'Lake', 'North', 'South', 'East', 'West']
+    kinds = ['School', 'College', 'University', 'Academy']
+    suburbs = [f"{rng.choice(words)}{rng.choice(['ton', 'field', 'vale', 'wood', 'bury'])}{n}"
+               for n in range(15000)]
+    customers = []
+    for i in range(count):
+        suburb = rng.choice(suburbs)
+        name = f"{suburb} {rng.choice(words)} {rng.choice(words)} {rng.choice(kinds)}"
+        customers.append({
+            'id': i + 1,
+            'name': name,
+            'contact': {'email': f"info@{suburb.lower()}{i % 97}.edu.au"},
+            'location': {'city': suburb, 'state': 'NSW', 'postcode': str(2000 + i % 900)},
+            'totalRevenue': rng.random() * 10000,
+            'totalOrderRevenue': 0,
+        })
+    return customers
+
+def _typo(word, rng):
+    """Swap two adjacent letters inside a word to simulate a typo"""
+    i = rng.randint(1, len(word) - 3)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def benchmark_queries(customers, queries, seed=7):
+    """Sample typeahead queries per kind: first keystrokes, suburb plus a
+    partial word, a partial second word, and a misspelt word"""
+    rng = random.Random(seed)
+    kinds = {'first keystrokes': [], 'suburb + prefix': [], 'words + prefix': [], 'fuzzy': []}
+    for _ in range(queries):
+        words = rng.choice(customers)['name'].split()
+        kinds['first keystrokes'].append(rng.choice(words)[:rng.randint(1, 2)])
+        kinds['suburb + prefix'].append(f"{words[0]} {words[1][:rng.randint(1, len(words[1]))]}")
+        kinds['words + prefix'].append(f"{words[1]} {words[2][:rng.randint(1, len(words[2]))]}")
+        long_words = [word for word in words if len(word) >= 5] or ['Secondary']
+        kinds['fuzzy'].append(_typo(rng.choice(long_words), rng))
+    return kinds
+
+def benchmark_search(count=100000, queries=2000):
+    """Measure build time, index size, load time and typeahead query latency"""
+    print(f"⏱️  Benchmarking search index with {count:,} organisations")
+    customers = _synthetic_customers(count)
+
+    start = time.perf_counter()
+    raw_index = build_search_index(customers)
+    build_seconds = time.perf_counter() - start
+    size_bytes = len(json.dumps(raw_index, separators=(',', ':')).encode('utf-8'))
+    start = time.perf_counter()
+    index = SearchIndex(raw_index)
+    load_seconds = time.perf_counter() - start
+    print(f"  - Build: {build_seconds:.2f}s, index size: {size_bytes / 1024 / 1024:.1f} MB, "
+          f"load: {load_seconds:.2f}s")
+    # A served index is long-lived; keep full collections from rescanning it mid-query
+    del raw_index
+    gc.collect()
+    gc.freeze()
+
+    for kind, sample_queries in benchmark_queries(customers, queries).items():
+        latencies = []
+        for query in sample_queries:
+            start = time.perf_counter()
+            index.search(query)
+            latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        print(f"  - {kind:16s} p50 {p50:.3f} ms, p95 {p95:.3f} ms, max {latencies[-1] * 1000:.3f} ms")
+
+def main():
+    """Build the search index from the enhanced dataset, or query it."""
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark_search()
+        return
+
+    if len(sys.argv) > 1:
+        index = SearchIndex.load()
+        for match in index.search(' '.join(sys.argv[1:])):
+            print(f"  {match['score']:.1f}  {match['name']} ({match['city']} {match['state']} {match['postcode']})")
+        return
+
+    print("🚀 Building Customer Search Index")
+    print("=" * 40)
+    with open('customer_mapping_data_enhanced.json', 'r') as f:
+        customers = json.load(f)
+    save_search_index(customers, DEFAULT_INDEX_FILE)
+    print(f"  ✅ Indexed {len(customers)} customers into {DEFAULT_INDEX_FILE}")
+
+if __name__ == "__main__":
+    main()
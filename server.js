@@ -141,7 +141,8 @@ let customersWithBoth = [];
 
 function loadCustomerData() {
   try {
-    const dataPath = path.join(__dirname, 'customer_mapping_data_enhanced.json');
+    // CUSTOMER_DATA_FILE lets load tests point the server at a scaled dataset
+    const dataPath = process.env.CUSTOMER_DATA_FILE || path.join(__dirname, 'customer_mapping_data_enhanced.json');
     console.log(`📄 Loading customer data from: ${dataPath}`);
     
     if (!fs.existsSync(dataPath)) {
@@ -155,7 +156,12 @@ function loadCustomerData() {
     console.log(`👥 Parsed ${allCustomers.length} customer records`);
     
     // Add interaction recency calculation for each customer
+    // (skipped when the pipeline has already precomputed it)
     allCustomers = allCustomers.map(customer => {
+      if (customer.lastInteractionDay !== undefined) {
+        return customer;
+      }
+      
       let latestInteractionDate = null;
       
       // Check last service date (already calculated at customer level)
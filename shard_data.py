@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Sharded Customer Data
+Splits the enhanced dataset into per-state and per-region shards plus a
+lightweight summary shard carrying only what list and map views draw, so
+clients can load only what they need and fetch detail on demand.
+"""
+
+import os
+import re
+import json
+from collections import defaultdict
+
+SHARDS_DIR = 'shards'
+UNKNOWN_SHARD = 'unknown'
+
+# Fields a list or map view needs; contact details, addresses and the
+# per-job and per-order arrays stay in the state and region shards
+SUMMARY_FIELDS = ('id', 'name', 'organizationType', 'region', 'territory',
+                  'totalRevenue', 'totalOrderRevenue', 'combinedRevenue',
+                  'recencyBucket', 'sizeBucket')
+SUMMARY_LOCATION_FIELDS = ('lat', 'lng', 'city', 'state')
+
+def shard_slug(name):
+    """Filesystem-safe shard name for a state or region"""
+    slug = re.sub(r'[^a-z0-9]+', '-', (name or '').strip().lower()).strip('-')
+    return slug or UNKNOWN_SHARD
+
+def summarize_customer(customer):
+    """Customer record reduced to the summary fields, with job and order counts"""
+    summary = {key: customer[key] for key in SUMMARY_FIELDS if key in customer}
+    location = customer.get('location') or {}
+    summary['location'] = {key: location.get(key) for key in SUMMARY_LOCATION_FIELDS}
+    summary['jobCount'] = len(customer.get('jobs') or [])
+    summary['orderCount'] = len(customer.get('orders') or [])
+    return summary
+
+def _compact(records):
+    """Records encoded the way shards are written"""
+    return json.dumps(records, separators=(',', ':'), default=str).encode('utf-8')
+
+def _write_shard(path, records):
+    """Write a compact JSON shard and return its size in bytes"""
+    encoded = _compact(records)
+    with open(path, 'wb') as f:
+        f.write(encoded)
+    return len(encoded)
+
+def write_shards(customers, data_file):
+    """Write state, region and summary shards next to the data file.
+
+    Returns the shard index, which lists every shard with its record count
+    and payload size so clients can pick what to fetch.
+    """
+    shards_dir = os.path.join(os.path.dirname(data_file), SHARDS_DIR)
+    for kind in ('state', 'region'):
+        os.makedirs(os.path.join(shards_dir, kind), exist_ok=True)
+
+    by_state = defaultdict(list)
+    by_region = defaultdict(list)
+    for customer in customers:
+        by_state[shard_slug((customer.get('location') or {}).get('state'))].append(customer)
+        by_region[shard_slug(customer.get('region'))].append(customer)
+
+    # Shards are compact JSON, so they are compared against the full dataset
+    # in the same encoding; full_bytes is the indented file as written
+    index = {'full_bytes': os.path.getsize(data_file), 'full_compact_bytes': len(_compact(customers)),
+             'summary': None, 'state': {}, 'region': {}}
+
+    summary_path = os.path.join(shards_dir, 'summary.json')
+    index['summary'] = {
+        'file': os.path.relpath(summary_path, shards_dir),
+        'count': len(customers),
+        'bytes': _write_shard(summary_path, [summarize_customer(c) for c in customers]),
+    }
+
+    for kind, groups in (('state', by_state), ('region', by_region)):
+        # Remove shards left over from a previous build whose group has gone;
+        # compressed variants are cleaned up by precompress
+        for stale in os.listdir(os.path.join(shards_dir, kind)):
+            if stale.endswith('.json') and stale[:-len('.json')] not in groups:
+                os.remove(os.path.join(shards_dir, kind, stale))
+        for slug, records in sorted(groups.items()):
+            path = os.path.join(shards_dir, kind, f"{slug}.json")
+            index[kind][slug] = {
+                'file': os.path.relpath(path, shards_dir),
+                'count': len(records),
+                'bytes': _write_shard(path, records),
+            }
+
+    with open(os.path.join(shards_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+
+    report_shard_sizes(index)
+    return index
+
+def report_shard_sizes(index):
+    """Print payload sizes for each shard type against the compact full dataset"""
+    full = index['full_compact_bytes']
+    print(f"  📦 Shard payload sizes (full dataset {full / 1024:,.0f} KB compact, "
+          f"{index['full_bytes'] / 1024:,.0f} KB as written):")
+    summary = index['summary']['bytes']
+    print(f"    - summary: {summary / 1024:,.0f} KB ({summary / full * 100:.1f}% of full)")
+    for kind in ('state', 'region'):
+        sizes = [shard['bytes'] for shard in index[kind].values()]
+        if not sizes:
+            continue
+        print(f"    - {kind}: {len(sizes)} shards, "
+              f"avg {sum(sizes) / len(sizes) / 1024:,.0f} KB, max {max(sizes) / 1024:,.0f} KB "
+              f"({max(sizes) / full * 100:.1f}% of full)")
+
+def main():
+    """Write shards for the current enhanced dataset."""
+    data_file = 'customer_mapping_data_enhanced.json'
+
+    print("🚀 Sharding Customer Data")
+    print("=" * 40)
+    with open(data_file, 'r') as f:
+        customers = json.load(f)
+    index = write_shards(customers, data_file)
+    print(f"  ✅ Wrote {len(index['state'])} state and {len(index['region'])} region shards")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Sales Territory Clustering
+Splits geocoded customers into compact sales territories whose combined
+revenue is balanced across reps, using vectorised weighted k-means with a
+capacitated assignment step, and writes the assignment back onto each customer.
+"""
+
+import sys
+import json
+import time
+
+DEFAULT_TERRITORIES = 8
+
+# Revenue-less organisations still cost a rep time, so each counts this much
+BASE_WEIGHT = 500.0
+
+# No territory may carry more than this fraction above the mean load
+BALANCE_TOLERANCE = 0.01
+
+KM_PER_DEGREE = 111.32
+
+def project_km(lats, lngs):
+    """Equirectangular projection of coordinates to km around their centroid"""
+    import numpy as np
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    lat0 = np.radians(lats.mean())
+    return np.column_stack((lngs * np.cos(lat0) * KM_PER_DEGREE, lats * KM_PER_DEGREE))
+
+def _squared_distances(points, centres):
+    """n x k squared distances without materialising an n x k x 2 array"""
+    return ((points ** 2).sum(axis=1)[:, None]
+            - 2.0 * points @ centres.T
+            + (centres ** 2).sum(axis=1)[None, :])
+
+def _weighted_kmeans_plus_plus(points, weights, k, rng):
+    """Pick k initial centres, spread out and biased toward heavy points"""
+    import numpy as np
+    centres = [points[rng.choice(len(points), p=weights / weights.sum())]]
+    closest = ((points - centres[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        probabilities = closest * weights
+        total = probabilities.sum()
+        index = rng.choice(len(points), p=probabilities / total) if total > 0 else rng.integers(len(points))
+        centres.append(points[index])
+        closest = np.minimum(closest, ((points - points[index]) ** 2).sum(axis=1))
+    return np.array(centres)
+
+def capacitated_assignment(distances, weights, capacity):
+    """Assign points to centres without any centre exceeding capacity.
+
+    Runs in vectorised rounds: every unassigned point proposes to its nearest
+    centre that has not yet turned it down, each centre accepts its closest
+    proposers while their cumulative weight fits, and rejected points are
+    barred from that centre. Points every centre has refused go to the centre
+    with the most room left.
+    """
+    import numpy as np
+    n, k = distances.shape
+    distances = distances.copy()
+    labels = np.full(n, -1, dtype=np.int64)
+    remaining = np.full(k, capacity, dtype=np.float64)
+    pending = np.arange(n)
+
+    while pending.size:
+        choice = np.argmin(distances[pending], axis=1)
+        nearest = distances[pending, choice]
+        refused = np.isinf(nearest)
+        for point in pending[refused]:
+            centre = int(np.argmax(remaining))
+            labels[point] = centre
+            remaining[centre] -= weights[point]
+        pending, choice, nearest = pending[~refused], choice[~refused], nearest[~refused]
+        if not pending.size:
+            break
+
+        # Group proposals by centre, closest first, and take the prefix that fits
+        order = np.lexsort((nearest, choice))
+        centres, points = choice[order], pending[order]
+        cumulative = np.cumsum(weights[points])
+        group_start = np.searchsorted(centres, centres, side='left')
+        before = np.where(group_start > 0, cumulative[group_start - 1], 0.0)
+        accepted = cumulative - before <= remaining[centres]
+
+        labels[points[accepted]] = centres[accepted]
+        remaining -= np.bincount(centres[accepted], weights=weights[points[accepted]], minlength=k)
+        distances[points[~accepted], centres[~accepted]] = np.inf
+        pending = points[~accepted]
+
+    return labels
+
+def balanced_kmeans(points, weights, k, max_iter=15, tolerance=BALANCE_TOLERANCE, seed=42, balance=True):
+    """Weighted k-means whose clusters carry roughly equal total weight.
+
+    Each iteration assigns points with capacitated_assignment() at a capacity
+    of (1 + tolerance) times the mean load, then moves centres to the
+    weighted mean of their points. balance=False gives plain weighted
+    k-means (nearest centre only). Returns (labels, centres, loads).
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    weights = np.asarray(weights, dtype=np.float64)
+    centres = _weighted_kmeans_plus_plus(points, weights, k, rng)
+    capacity = weights.sum() / k * (1.0 + tolerance)
+    labels = np.full(len(points), -1)
+    loads = np.zeros(k)
+
+    for _ in range(max_iter):
+        distances = _squared_distances(points, centres)
+        if balance:
+            new_labels = capacitated_assignment(distances, weights, capacity)
+        else:
+            new_labels = np.argmin(distances, axis=1)
+        loads = np.bincount(new_labels, weights=weights, minlength=k)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        for axis in range(points.shape[1]):
+            sums = np.bincount(labels, weights=weights * points[:, axis], minlength=k)
+            occupied = loads > 0
+            centres[occupied, axis] = sums[occupied] / loads[occupied]
+
+    return labels, centres, loads
+
+def customer_weight(customer, base_weight=BASE_WEIGHT):
+    """Combined revenue plus a base cost per organisation"""
+    revenue = customer.get('combinedRevenue')
+    if revenue is None:
+        revenue = (customer.get('totalRevenue') or 0) + (customer.get('totalOrderRevenue') or 0)
+    return revenue + base_weight
+
+def assign_territories(customers, k=DEFAULT_TERRITORIES, base_weight=BASE_WEIGHT, seed=42):
+    """Write a 'territory' number onto each customer in place.
+
+    Customers without coordinates get None. Returns the per-territory loads.
+    """
+    import numpy as np
+    geocoded = [c for c in customers
+                if (c.get('location') or {}).get('lat') is not None
+                and (c.get('location') or {}).get('lng') is not None]
+    for customer in customers:
+        customer['territory'] = None
+    if len(geocoded) < k:
+        return []
+
+    points = project_km([c['location']['lat'] for c in geocoded],
+                        [c['location']['lng'] for c in geocoded])
+    weights = np.array([customer_weight(c, base_weight) for c in geocoded])
+    labels, _, loads = balanced_kmeans(points, weights, k, seed=seed)
+
+    # Number territories west to east by centre so ids are stable-ish between builds
+    order = np.argsort([points[labels == t, 0].mean() if (labels == t).any() else np.inf for t in range(k)])
+    renumber = np.empty(k, dtype=np.int64)
+    renumber[order] = np.arange(k)
+    for customer, label in zip(geocoded, labels):
+        customer['territory'] = int(renumber[label]) + 1
+
+    print(f"  🧭 Assigned {len(geocoded)} customers to {k} territories "
+          f"(load max/min {loads.max() / max(loads.min(), 1e-9):.2f})")
+    return loads[order].tolist()
+
+def benchmark_territories(count=100000, k=12, seed=7):
+    """Time balanced clustering on synthetic customers clustered like Australian cities"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    cities = np.array([[-33.87, 151.21], [-37.81, 144.96], [-27.47, 153.03], [-31.95, 115.86],
+                       [-34.93, 138.60], [-35.28, 149.13], [-12.46, 130.84], [-42.88, 147.33]])
+    shares = np.array([0.3, 0.27, 0.17, 0.1, 0.07, 0.04, 0.02, 0.03])
+    city = rng.choice(len(cities), size=count, p=shares)
+    lats = cities[city, 0] + rng.normal(0, 0.8, count)
+    lngs = cities[city, 1] + rng.normal(0, 0.8, count)
+    weights = rng.exponential(2000, count) * (rng.random(count) < 0.4) + BASE_WEIGHT
+
+    points = project_km(lats, lngs)
+    print(f"⏱️  Benchmarking territory clustering: {count:,} customers, {k} territories")
+    start = time.perf_counter()
+    _, _, plain_loads = balanced_kmeans(points, weights, k, balance=False)
+    plain_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    _, _, loads = balanced_kmeans(points, weights, k)
+    balanced_seconds = time.perf_counter() - start
+    print(f"  - plain k-means:    {plain_seconds:5.2f}s, load max/min {plain_loads.max() / plain_loads.min():6.2f}")
+    print(f"  - balanced k-means: {balanced_seconds:5.2f}s, load max/min {loads.max() / loads.min():6.2f}")
+
+def main():
+    """Report territories for the enhanced dataset, or benchmark clustering."""
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark_territories()
+        return
+
+    data_file = 'customer_mapping_data_enhanced.json'
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TERRITORIES
+    with open(data_file, 'r') as f:
+        customers = json.load(f)
+    loads = assign_territories(customers, k)
+    for territory, load in enumerate(loads, 1):
+        count = sum(1 for c in customers if c['territory'] == territory)
+        print(f"  - Territory {territory}: {count} customers, weighted revenue ${load:,.0f}")
+
+if __name__ == "__main__":
+    main()
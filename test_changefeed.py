@@ -0,0 +1,68 @@
+import json
+import os
+
+from changefeed import (CHANGES_DIR, MANIFEST_FILE, apply_changeset, changesets_since,
+                        write_changefeed)
+
+def _customer(customer_id, name, revenue=0):
+    return {'id': customer_id, 'name': name, 'totalRevenue': revenue}
+
+def _build(data_file, customers):
+    with open(data_file, 'w') as f:
+        json.dump(customers, f)
+    return write_changefeed(customers, str(data_file))['build_id']
+
+def _by_id(customers):
+    return sorted(customers, key=lambda customer: customer['id'])
+
+FIRST = [_customer(1, 'Alfred Deakin High School'), _customer(2, 'Burgmann Anglican School'),
+         _customer(3, 'Canberra College')]
+SECOND = [_customer(1, 'Alfred Deakin High School'), _customer(2, 'Burgmann Anglican School', 2728),
+          _customer(4, 'Daramalan College')]
+
+def test_consumer_catches_up_to_the_next_build(tmp_path):
+    data_file = tmp_path / 'customers.json'
+    first_build = _build(data_file, FIRST)
+    _build(data_file, SECOND)
+
+    pending = changesets_since(str(data_file), first_build)
+    assert len(pending) == 1
+    customers = [dict(customer) for customer in FIRST]
+    for changeset in pending:
+        apply_changeset(customers, changeset)
+    assert _by_id(customers) == _by_id(SECOND)
+
+    # Replaying the same change set must not duplicate or resurrect records
+    apply_changeset(customers, pending[0])
+    assert _by_id(customers) == _by_id(SECOND)
+
+def test_manifest_without_state_file_forces_full_reload(tmp_path):
+    data_file = tmp_path / 'customers.json'
+    first_build = _build(data_file, FIRST)
+
+    # A manifest written before per-build state files existed
+    manifest_path = os.path.join(tmp_path, CHANGES_DIR, MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    del manifest['state_file']
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+    _build(data_file, SECOND)
+    # Removals can't be derived without the previous hashes, so consumers reload
+    assert changesets_since(str(data_file), first_build) is None
+
+def test_state_left_by_an_interrupted_build_is_ignored(tmp_path):
+    data_file = tmp_path / 'customers.json'
+    first_build = _build(data_file, FIRST)
+
+    # A build that crashed after writing its state but before the manifest
+    with open(os.path.join(tmp_path, CHANGES_DIR, 'state-crashed.json'), 'w') as f:
+        json.dump({}, f)
+
+    _build(data_file, SECOND)
+    customers = [dict(customer) for customer in FIRST]
+    for changeset in changesets_since(str(data_file), first_build):
+        apply_changeset(customers, changeset)
+    assert _by_id(customers) == _by_id(SECOND)
+    assert sorted(os.listdir(tmp_path / CHANGES_DIR)).count('state-crashed.json') == 0
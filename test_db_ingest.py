@@ -0,0 +1,47 @@
+import pytest
+
+from db_ingest import connect, create_sqlite_standin, iter_jobs, pull_organizations
+from extract_data import extract_jobs, extract_organizations
+
+def _by_id(records):
+    return sorted(records, key=lambda record: record['id'])
+
+@pytest.fixture
+def source(tmp_path):
+    source = connect(f"sqlite:///{create_sqlite_standin(str(tmp_path / 'mops.db'))}")
+    yield source
+    source.close()
+
+def test_full_pull_matches_the_dump_extractors(source, tmp_path):
+    organizations = pull_organizations(source, state_file=str(tmp_path / 'state.json'))
+    assert organizations == _by_id(extract_organizations())
+    assert list(iter_jobs(source)) == _by_id(extract_jobs())
+
+def test_incremental_pull_sees_inserts_updates_and_deletes(source, tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    previous = pull_organizations(source, state_file=state_file)
+    first_id, second_id = previous[0]['id'], previous[1]['id']
+    new_id = previous[-1]['id'] + 1
+
+    connection = source.connection
+    # Update: updated_at is set on edit
+    connection.execute("UPDATE wp_mops_organisations SET title = 'Renamed', updated_at = CURRENT_TIMESTAMP "
+                       "WHERE id = ?", (first_id,))
+    # Insert: updated_at stays NULL until the row is first edited
+    connection.execute("INSERT INTO wp_mops_organisations (id, title, created_at, updated_at) "
+                       "VALUES (?, 'New School', CURRENT_TIMESTAMP, NULL)", (new_id,))
+    # Legacy row with neither timestamp, only visible through id reconciliation
+    connection.execute("INSERT INTO wp_mops_organisations (id, title, created_at, updated_at) "
+                       "VALUES (?, 'Imported School', NULL, NULL)", (new_id + 1,))
+    connection.execute("DELETE FROM wp_mops_organisations WHERE id = ?", (second_id,))
+    connection.commit()
+
+    organizations = pull_organizations(source, previous, state_file=state_file)
+    by_id = {org['id']: org for org in organizations}
+    assert by_id[first_id]['title'] == 'Renamed'
+    assert by_id[new_id]['title'] == 'New School'
+    assert by_id[new_id + 1]['title'] == 'Imported School'
+    assert second_id not in by_id
+
+    # The incremental result matches a fresh full pull
+    assert organizations == pull_organizations(source, state_file=str(tmp_path / 'full.json'))
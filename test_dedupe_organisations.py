@@ -0,0 +1,33 @@
+from dedupe_organisations import is_duplicate, merge_organizations
+
+def _org(org_id, title, street, suburb='Mount Druitt', postcode='2770'):
+    return {
+        'id': org_id, 'region_id': 20, 'organisation_type_id': 1, 'title': title,
+        'physical_address_street': street, 'physical_address_suburb': suburb,
+        'physical_address_state': 'NSW', 'physical_address_postcode': postcode,
+        'email': '', 'phone': '',
+    }
+
+def test_multi_campus_school_is_not_merged():
+    campuses = [
+        _org(262, 'Chifley College', 'North Parade', 'Mount Druitt'),
+        _org(263, 'Chifley College', 'Bunya Rd', 'Bidwill'),
+        _org(1430, 'Chifley College', 'Noumea St Shalvey Campus', 'Shalvey'),
+    ]
+    assert not is_duplicate(campuses[0], campuses[1])
+    canonical, alias_map = merge_organizations(campuses)
+    assert alias_map == {}
+    assert [org['id'] for org in canonical] == [262, 263, 1430]
+
+def test_same_address_under_different_titles_is_merged():
+    orgs = [
+        _org(10, 'Chifley College Senior Campus', '67 North Parade'),
+        _org(11, 'Chifley Senior College', '67 North Pde'),
+    ]
+    canonical, alias_map = merge_organizations(orgs)
+    assert alias_map == {11: 10}
+    assert canonical[0]['merged_ids'] == [11]
+
+def test_blank_or_placeholder_street_merges_on_title():
+    orgs = [_org(20, 'Shalvey Public School', 'TBA'), _org(21, 'Shalvey Public School', '1 Noumea St')]
+    assert is_duplicate(orgs[0], orgs[1])
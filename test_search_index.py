@@ -0,0 +1,49 @@
+from search_index import SearchIndex
+
+def _customer(customer_id, name, city='Wodonga', revenue=0):
+    return {
+        'id': customer_id,
+        'name': name,
+        'contact': {'email': ''},
+        'location': {'city': city, 'state': 'VIC', 'postcode': '3690'},
+        'totalRevenue': revenue,
+        'totalOrderRevenue': 0,
+    }
+
+def test_single_letter_second_token_keeps_late_alphabet_terms():
+    # Plenty of vocabulary terms starting with "c" that sort before "christian"
+    filler = [_customer(i, f"Filler {prefix} School", city=f"Ca{prefix}", revenue=1000)
+              for i, prefix in enumerate((f"{n:03d}" for n in range(200)), 100)]
+    targets = [
+        _customer(1, 'Grace Christian College'),
+        _customer(2, 'Grace Christian College', city='Leneva'),
+        _customer(3, 'Grace Lutheran College'),
+    ]
+    index = SearchIndex.from_customers(filler + targets)
+
+    ids = {match['id'] for match in index.search('grace c')}
+    assert ids == {1, 2, 3}
+
+def test_prefix_still_matches_after_exact_tokens():
+    index = SearchIndex.from_customers([
+        _customer(1, 'University of Melbourne - Parkville'),
+        _customer(2, 'University of Sydney'),
+    ])
+    assert [match['id'] for match in index.search('university of m')] == [1]
+
+def test_broad_short_prefix_ranks_by_revenue_and_reaches_past_the_top_docs():
+    # More "s" terms and documents than the precomputed top-docs list covers
+    filler = [_customer(i, f"Filler S{n:03d} School", city=f"Sale{n:03d}", revenue=1000 + n)
+              for i, n in enumerate(range(400), 100)]
+    index = SearchIndex.from_customers(filler + [_customer(1, 'Grace Stanley College')])
+
+    best_first = sorted(filler, key=lambda customer: -customer['totalRevenue'])
+    assert [match['id'] for match in index.search('s')] == [customer['id'] for customer in best_first[:10]]
+    assert [match['id'] for match in index.search('s grace')] == [1]
+
+def test_fuzzy_match_on_first_query_after_load():
+    index = SearchIndex.from_customers([
+        _customer(1, 'Grace Christian College'),
+        _customer(2, 'Wodonga Primary School'),
+    ])
+    assert [match['id'] for match in index.search('chrsitian')] == [1]